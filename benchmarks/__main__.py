@@ -0,0 +1,82 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""Runs the libthumbor benchmarks.
+
+python -m benchmarks                          # run everything
+python -m benchmarks -k generate              # only matching benchmarks
+python -m benchmarks --save baseline.json     # keep results to compare
+python -m benchmarks --compare baseline.json  # exits 1 on regressions
+"""
+
+import argparse
+import importlib
+import sys
+
+from benchmarks import runner
+
+MODULES = (
+    "benchmarks.url_parts",
+    "benchmarks.generation",
+    "benchmarks.parsing",
+    "benchmarks.signing",
+    "benchmarks.django_views",
+    "benchmarks.import_time",
+)
+
+
+def collect(keyword=None):
+    for module_name in MODULES:
+        module = importlib.import_module(module_name)
+        for name, func in module.benchmarks():
+            if keyword is None or keyword.lower() in name.lower():
+                yield name, func
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("-k", dest="keyword", help="only run matching benchmarks")
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--sample-time", type=float, default=0.02)
+    parser.add_argument("--save", metavar="PATH", help="save results as JSON")
+    parser.add_argument(
+        "--compare", metavar="PATH", help="compare against saved results"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="median slowdown reported as regression (default: 0.1, 10%%)",
+    )
+    args = parser.parse_args(argv)
+
+    print(runner.HEADER)
+    results = []
+    for name, func in collect(args.keyword):
+        result = runner.run(
+            name, func, samples=args.samples, sample_time=args.sample_time
+        )
+        results.append(result)
+        print(runner.format_result(result), flush=True)
+
+    if args.save:
+        runner.save(results, args.save)
+
+    if args.compare:
+        print()
+        regressions = runner.compare(results, runner.load(args.compare), args.threshold)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
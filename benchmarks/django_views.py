@@ -0,0 +1,89 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""The Django generate_url view, called directly without the test client.
+
+The response cache serves the 200 cycled queries of "django generate_url"
+once warm, "uncached" cycles through more queries than it holds.
+"""
+
+import json
+
+from benchmarks.workload import SECURITY_KEY, cycling, sample_options
+
+
+def _query(options):
+    query = {
+        name: value
+        for name, value in options.items()
+        if name
+        in (
+            "image_url",
+            "width",
+            "height",
+            "fit_in",
+            "meta",
+            "halign",
+            "valign",
+            "smart",
+        )
+    }
+    if "crop" in options:
+        (left, top), (right, bottom) = options["crop"]
+        query.update(crop_left=left, crop_top=top, crop_right=right, crop_bottom=bottom)
+    return query
+
+
+def benchmarks():
+    try:
+        import django  # pylint: disable=import-outside-toplevel
+        from django.conf import settings  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return []
+
+    if not settings.configured:
+        settings.configure(
+            THUMBOR_SECURITY_KEY=SECURITY_KEY,
+            THUMBOR_SERVER="http://localhost:8888/",
+            ALLOWED_HOSTS=["testserver"],
+        )
+        django.setup()
+
+    # pylint: disable=import-outside-toplevel
+    from django.test import RequestFactory
+
+    from libthumbor.django.views import generate_url, generate_urls
+
+    factory = RequestFactory()
+    requests = [
+        factory.get("/gen_url/", _query(options)) for options in sample_options(200)
+    ]
+    next_request = cycling(requests)
+    # more distinct queries than the response cache holds, so none is cached
+    uncached_requests = [
+        factory.get("/gen_url/", {**_query(options), "image_url": f"{index}.jpg"})
+        for index, options in enumerate(sample_options(2000))
+    ]
+    next_uncached_request = cycling(uncached_requests)
+    # a product grid of 60 images in one request
+    batch_request = factory.post(
+        "/gen_urls/",
+        json.dumps([_query(options) for options in sample_options(60)]),
+        content_type="application/json",
+    )
+
+    return [
+        ("django generate_url", lambda: generate_url(next_request())),
+        (
+            "django generate_url uncached",
+            lambda: generate_url(next_uncached_request()),
+        ),
+        ("django generate_urls x60", lambda: generate_urls(batch_request)),
+    ]
@@ -0,0 +1,64 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""URL generation: CryptoURL.generate, iter_generate, columns, unsafe_url and
+url_for."""
+
+from collections import deque
+
+from benchmarks.workload import SECURITY_KEY, cycling, sample_options
+from libthumbor.columnar import sign_urls
+from libthumbor.crypto import CryptoURL
+from libthumbor.url import unsafe_url, url_for
+
+
+def benchmarks():
+    crypto = CryptoURL(SECURITY_KEY)
+    next_options = cycling(sample_options())
+    batch = sample_options()[:100]
+    preset = {"fit_in": True, "width": 300, "height": 200, "smart": True}
+    next_bytes_options = cycling(
+        [
+            {**options, "image_url": options["image_url"].encode("utf-8")}
+            for options in sample_options()
+        ]
+    )
+    buffer = bytearray()
+    column = [f"images.example.com/products/{index}.jpg" for index in range(1000)]
+
+    return [
+        ("CryptoURL.generate", lambda: crypto.generate(**next_options())),
+        (
+            "CryptoURL.iter_generate x100",
+            lambda: deque(crypto.iter_generate(batch), maxlen=0),
+        ),
+        (
+            "CryptoURL.generate encoded",
+            lambda: crypto.generate(**next_options()).encode("utf-8"),
+        ),
+        (
+            "CryptoURL.generate_bytes",
+            lambda: crypto.generate_bytes(**next_bytes_options()),
+        ),
+        (
+            "CryptoURL.sign_into",
+            lambda: (
+                buffer.clear(),
+                crypto.sign_into(buffer, **next_bytes_options()),
+            ),
+        ),
+        (
+            "CryptoURL.generate column x1000",
+            lambda: [crypto.generate(image_url=url, **preset) for url in column],
+        ),
+        ("sign_urls column x1000", lambda: sign_urls(crypto, column, **preset)),
+        ("unsafe_url", lambda: unsafe_url(**next_options())),
+        ("url_for", lambda: url_for(**next_options())),
+    ]
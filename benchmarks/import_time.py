@@ -0,0 +1,128 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""Cold start: fresh interpreters importing libthumbor.
+
+The suite times whole processes, "python -S -c pass" giving the interpreter
+startup to subtract. For the per-module breakdown of python -X importtime,
+next to the one of another checkout such as a worktree of the last release:
+
+    git worktree add /tmp/baseline <release tag>
+    python -m benchmarks.import_time /tmp/baseline
+"""
+
+import os
+import site
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENTS = (
+    "pass",
+    "import libthumbor",
+    "from libthumbor import Url",
+    "from libthumbor import CryptoURL",
+)
+
+
+# the whole statement: libthumbor modules imported by other modules are counted
+# within them, and the standard library by the first module importing it
+TOTAL = "total"
+
+
+def _command(statement, *options):
+    # -S skips site-packages, so libthumbor must import without dependencies
+    return [sys.executable, "-S", *options, "-c", statement]
+
+
+def benchmarks():
+    return [
+        (
+            f"cold python -S -c '{statement}'",
+            lambda command=_command(statement): subprocess.run(
+                command, cwd=ROOT, check=True
+            ),
+        )
+        for statement in STATEMENTS
+    ]
+
+
+def import_times(statement, root=ROOT, env=None):
+    """{module: cumulative microseconds} reported by python -X importtime"""
+    process = subprocess.run(
+        _command(statement, "-X", "importtime"),
+        cwd=root,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    times = {}
+    total = 0
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+        # modules imported by the statement itself, not by another module
+        if name.startswith(" libthumbor"):
+            total += int(cumulative)
+    times[TOTAL] = total
+    return times
+
+
+def median_import_times(statement, root, runs):
+    """{libthumbor module: median cumulative microseconds} of runs imports"""
+    # older releases have dependencies: site-packages are put on the path,
+    # still without running site, so both trees start from the same modules
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(site.getsitepackages()))
+    samples = [import_times(statement, root, env) for _ in range(runs)]
+    names = dict.fromkeys(
+        name
+        for sample in samples
+        for name in sample
+        if name.startswith("libthumbor") or name == TOTAL
+    )
+    return {
+        name: statistics.median(sample.get(name, 0) for sample in samples)
+        for name in names
+    }
+
+
+def _milliseconds(microseconds):
+    return "" if microseconds is None else f"{microseconds / 1000:8.2f} ms"
+
+
+def main(argv=None, runs=20):
+    argv = sys.argv[1:] if argv is None else argv
+    baseline = argv[0] if argv else None
+
+    for statement in STATEMENTS[1:]:
+        current = median_import_times(statement, ROOT, runs)
+        previous = median_import_times(statement, baseline, runs) if baseline else {}
+
+        print(f"{statement}  (median of {runs} runs, cumulative)")
+        if baseline:
+            print(f"  {'baseline':>11}  {'this tree':>11}")
+        names = [name for name in {**previous, **current} if name != TOTAL]
+        for name in [*names, TOTAL]:
+            columns = [_milliseconds(current.get(name))]
+            if baseline:
+                columns.insert(0, _milliseconds(previous.get(name)))
+            print("  " + "  ".join(f"{column:>11}" for column in columns), name)
+        print()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
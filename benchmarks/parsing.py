@@ -0,0 +1,51 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""URL parsing: Url.parse_decrypted, Url.parse and Url.iter_parse."""
+
+from collections import deque
+
+from benchmarks.workload import SECURITY_KEY, cycling, sample_options, sample_paths
+from libthumbor.crypto import CryptoURL
+from libthumbor.url import Url
+from libthumbor.url_signers.base64_hmac_sha1 import UrlSigner
+
+LONG_PATH = (
+    "fit-in/300x300/filters:quality(80):format(webp):fill(white):"
+    "watermark(images.example.com/watermarks/logo.png,-10,-10,50)/"
+    "images.example.com/catalog/2024/05/some/deeply/nested/directory/"
+    "product-1234-front-view-high-resolution.jpg"
+)
+
+
+def benchmarks():
+    next_path = cycling(sample_paths())
+    crypto = CryptoURL(SECURITY_KEY)
+    next_url = cycling([crypto.generate(**options) for options in sample_options()])
+    signer = UrlSigner(SECURITY_KEY)
+    lines = [f"{crypto.generate(**options)}\n" for options in sample_options()[:100]]
+
+    return [
+        ("Url.parse_decrypted", lambda: Url.parse_decrypted(next_path())),
+        (
+            "Url.parse_decrypted as_object",
+            lambda: Url.parse_decrypted(next_path(), as_object=True),
+        ),
+        ("Url.parse_decrypted long filters", lambda: Url.parse_decrypted(LONG_PATH)),
+        ("Url.parse signed", lambda: Url.parse(next_url(), signer=signer)),
+        (
+            "Url.iter_parse signed x100",
+            lambda: deque(Url.iter_parse(lines, signer=signer), maxlen=0),
+        ),
+        (
+            "Url.parse_decrypted_with_regex",
+            lambda: Url.parse_decrypted_with_regex(next_path()),
+        ),
+    ]
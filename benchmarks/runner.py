@@ -0,0 +1,149 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""Minimal offline benchmark runner, in the spirit of pyperf.
+
+Each benchmark is a callable without arguments. It is calibrated so one
+sample takes about sample_time seconds, then timed over several samples.
+Each sample gives the mean latency of its calls, and the throughput and the
+p50/p95/p99 reported are those of the sample means, not of single calls:
+with the default 20 samples, p99 is the slowest sample. Peak memory
+allocated by a single call is measured separately with tracemalloc, so it
+does not skew the timings.
+"""
+
+import json
+import statistics
+import time
+import tracemalloc
+from collections import namedtuple
+
+Result = namedtuple(
+    "Result", ["name", "ops_per_sec", "mean", "p50", "p95", "p99", "alloc_bytes"]
+)
+
+
+HEADER = (
+    f"{'benchmark':<48} {'throughput':>18}"
+    "  percentiles of the per-sample mean latency per call"
+)
+
+
+def calibrate(func, sample_time):
+    """Number of calls that take at least sample_time seconds"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+
+        if elapsed >= sample_time:
+            return loops
+
+        loops = max(loops * 2, int(loops * sample_time / max(elapsed, 1e-9)))
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def allocated_bytes(func, calls=10):
+    """Lowest peak of memory allocated by a single call, in bytes"""
+    func()  # warm up caches so they are not counted against the call
+    peaks = []
+
+    tracemalloc.start()
+    try:
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            func()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+
+    return min(peaks)
+
+
+def run(name, func, samples=20, sample_time=0.02):
+    """Result of name, the percentiles being those of the sample means"""
+    loops = calibrate(func, sample_time)
+    timings = []
+
+    for _ in range(samples):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        timings.append((time.perf_counter() - start) / loops)
+
+    timings.sort()
+    mean = statistics.fmean(timings)
+
+    return Result(
+        name,
+        1 / mean,
+        mean,
+        percentile(timings, 0.50),
+        percentile(timings, 0.95),
+        percentile(timings, 0.99),
+        allocated_bytes(func),
+    )
+
+
+def format_result(result):
+    return (
+        f"{result.name:<48} {result.ops_per_sec:>12,.0f} ops/s"
+        f"  p50 {result.p50 * 1e6:8.3f} us"
+        f"  p95 {result.p95 * 1e6:8.3f} us"
+        f"  p99 {result.p99 * 1e6:8.3f} us"
+        f"  {result.alloc_bytes:>7,} B/call"
+    )
+
+
+def save(results, path):
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump(
+            {result.name: result._asdict() for result in results}, output, indent=2
+        )
+
+
+def load(path):
+    with open(path, encoding="utf-8") as baseline:
+        return {name: Result(**values) for name, values in json.load(baseline).items()}
+
+
+def compare(results, baseline, threshold):
+    """Prints how each result moved against the baseline.
+
+    Returns the names of the benchmarks whose median latency got slower by
+    more than threshold (a fraction, 0.1 meaning 10%).
+    """
+    regressions = []
+
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None:
+            print(f"{result.name:<48} (not in baseline)")
+            continue
+
+        change = result.p50 / previous.p50 - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(result.name)
+
+        print(
+            f"{result.name:<48} {previous.p50 * 1e6:8.3f} us -> "
+            f"{result.p50 * 1e6:8.3f} us  {change:+7.1%}{flag}"
+        )
+
+    return regressions
@@ -0,0 +1,65 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""Signing and validation with the bundled URL signers."""
+
+from benchmarks.workload import SECURITY_KEY, cycling, sample_paths
+from libthumbor.url_signers import load
+from libthumbor.url_signers.base64_hmac_sha1 import UrlSigner
+from libthumbor.url_signers.multi_key import MultiKeyUrlSigner
+
+SIGNER_MODULES = (
+    "base64_hmac_sha1",
+    "base64_hmac_sha256",
+    "base64_blake2b",
+    "base64_blake2s",
+)
+
+
+def benchmarks():
+    signer = UrlSigner(SECURITY_KEY)
+    paths = sample_paths()
+    next_path = cycling(paths)
+    signed = [(signer.signature(path), path) for path in paths]
+    next_signed = cycling(signed)
+    next_signed_str = cycling(
+        [(signature.decode("ascii"), path) for signature, path in signed]
+    )
+
+    result = [
+        ("UrlSigner.signature", lambda: signer.signature(next_path())),
+        (
+            "UrlSigner per request",
+            lambda: UrlSigner(SECURITY_KEY).signature(next_path()),
+        ),
+        ("UrlSigner.signatures x1000", lambda: signer.signatures(paths)),
+        ("UrlSigner.validate", lambda: signer.validate(*next_signed())),
+        ("UrlSigner.validate str", lambda: signer.validate(*next_signed_str())),
+    ]
+
+    # during a rotation most urls are still signed with the previous key
+    rotating = MultiKeyUrlSigner(["next-security-key", SECURITY_KEY])
+    result.append(
+        (
+            "MultiKeyUrlSigner.validate previous key",
+            lambda: rotating.validate(*next_signed()),
+        )
+    )
+
+    for module_name in SIGNER_MODULES:
+        module_signer = load(f"libthumbor.url_signers.{module_name}")(SECURITY_KEY)
+        result.append(
+            (
+                f"{module_name} signature",
+                lambda sign=module_signer.signature: sign(next_path()),
+            )
+        )
+
+    return result
@@ -0,0 +1,98 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""Per-call cost of composing thumbor URLs for typical option mixes."""
+
+from libthumbor.url import Url, get_url_parts
+
+IMAGE_URL = "images.example.com/catalog/2024/05/product-1234.jpg"
+
+OPTION_MIXES = {
+    "image only": {"image_url": IMAGE_URL},
+    "width and height": {"image_url": IMAGE_URL, "width": 300, "height": 200},
+    "fit-in preset": {
+        "image_url": IMAGE_URL,
+        "fit_in": True,
+        "width": 300,
+        "height": 200,
+        "filters": ["quality(80)", "format(webp)"],
+    },
+    "smart crop": {
+        "image_url": IMAGE_URL,
+        "width": 150,
+        "height": 150,
+        "smart": True,
+    },
+    "every option": {
+        "image_url": IMAGE_URL,
+        "meta": True,
+        "trim": ("top-left", 10),
+        "crop": ((10, 10), (200, 200)),
+        "width": 300,
+        "height": 200,
+        "flip": True,
+        "halign": "left",
+        "valign": "top",
+        "smart": True,
+        "filters": ["blur(2)"],
+    },
+}
+
+GENERATE_OPTIONS_MIXES = {
+    "defaults": {},
+    "fit-in preset": {
+        "width": 300,
+        "height": 200,
+        "fit_in": True,
+        "filters": "quality(80):format(webp)",
+    },
+    "every option": {
+        "debug": True,
+        "width": 300,
+        "height": 200,
+        "smart": True,
+        "meta": True,
+        "trim": True,
+        "adaptive": True,
+        "full": True,
+        "fit_in": True,
+        "horizontal_flip": True,
+        "vertical_flip": True,
+        "halign": "left",
+        "valign": "top",
+        "crop_left": 10,
+        "crop_top": 10,
+        "crop_right": 200,
+        "crop_bottom": 200,
+        "filters": "blur(2)",
+    },
+}
+
+
+def benchmarks():
+    result = []
+
+    for name, options in OPTION_MIXES.items():
+        result.append(
+            (
+                f"get_url_parts {name}",
+                lambda options=options: get_url_parts(**options),
+            )
+        )
+
+    for name, options in GENERATE_OPTIONS_MIXES.items():
+        result.append(
+            (
+                f"Url.generate_options {name}",
+                lambda options=options: Url.generate_options(**options),
+            )
+        )
+
+    return result
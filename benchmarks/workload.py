@@ -0,0 +1,84 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""Realistic option distributions shared by the benchmarks."""
+
+import itertools
+import random
+
+from libthumbor.url import plain_image_url
+
+SECURITY_KEY = "my-security-key"
+
+# (weight, options) pairs modelled on a catalog site: mostly fixed-size
+# thumbnails and fit-in presets, with a tail of crops and rarer options.
+OPTION_MIXES = (
+    (40, {"width": 300, "height": 200}),
+    (
+        25,
+        {
+            "fit_in": True,
+            "width": 300,
+            "height": 300,
+            "filters": ["quality(80)", "format(webp)"],
+        },
+    ),
+    (15, {"width": 150, "height": 150, "smart": True}),
+    (10, {"width": 1024}),
+    (
+        5,
+        {
+            "crop": ((10, 10), (500, 400)),
+            "width": 300,
+            "height": 240,
+            "filters": ["quality(85)"],
+        },
+    ),
+    (
+        5,
+        {
+            "meta": True,
+            "trim": True,
+            "fit_in": True,
+            "width": 800,
+            "height": 600,
+            "halign": "left",
+            "valign": "top",
+        },
+    ),
+)
+
+
+def sample_options(count=1000, seed=42):
+    """Deterministic sample of url_for style options, image_url included"""
+    rand = random.Random(seed)
+    weights = [weight for weight, _ in OPTION_MIXES]
+    mixes = rand.choices([options for _, options in OPTION_MIXES], weights, k=count)
+
+    return [
+        dict(
+            options,
+            image_url=(
+                f"images.example.com/catalog/{rand.randint(2010, 2024)}/"
+                f"{rand.randint(1, 12):02d}/product-{rand.randint(1, 10 ** 6)}.jpg"
+            ),
+        )
+        for options in mixes
+    ]
+
+
+def sample_paths(count=1000, seed=42):
+    """Paths as thumbor receives them after the signature"""
+    return [plain_image_url(**options) for options in sample_options(count, seed)]
+
+
+def cycling(items):
+    """Callable returning the next item of items, forever"""
+    return itertools.cycle(items).__next__
@@ -10,6 +10,35 @@
 
 """libthumbor is the library used to access thumbor's images in python"""
 
-from libthumbor.crypto import CryptoURL  # NOQA
-from libthumbor.url import Url  # NOQA
-from libthumbor.url_signers.base64_hmac_sha1 import UrlSigner as Signer  # NOQA
+# public names, imported from their module on first access (PEP 562), so
+# that "import libthumbor" stays cheap for processes that start often
+_LAZY_ATTRIBUTES = {
+    "CryptoURL": ("libthumbor.crypto", "CryptoURL"),
+    "Url": ("libthumbor.url", "Url"),
+    "Signer": ("libthumbor.url_signers.base64_hmac_sha1", "UrlSigner"),
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+# true for type checkers and linters only, without importing typing
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from libthumbor.crypto import CryptoURL  # NOQA
+    from libthumbor.url import Url  # NOQA
+    from libthumbor.url_signers.base64_hmac_sha1 import UrlSigner as Signer  # NOQA
+
+
+def __getattr__(name):
+    try:
+        module_name, attribute = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    # an import statement rather than importlib, so -X importtime reports it
+    value = getattr(__import__(module_name, fromlist=[attribute]), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
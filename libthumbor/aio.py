@@ -0,0 +1,133 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""Encrypted URLs for thumbor from asyncio code, without blocking the loop."""
+
+import asyncio
+from collections import deque
+from itertools import islice
+
+from libthumbor.crypto import CryptoURL
+
+
+async def _take(iterator, size):
+    """List of up to size next items of a sync or async iterator"""
+    if hasattr(iterator, "__anext__"):
+        items = []
+        while len(items) < size:
+            try:
+                items.append(await anext(iterator))
+            except StopAsyncIteration:
+                break
+        return items
+
+    return list(islice(iterator, size))
+
+
+async def _chunks(head, iterator, size):
+    """Lists of up to size items of the head list, then of iterator"""
+    while len(head) >= size:
+        yield head[:size]
+        head = head[size:]
+
+    chunk = head + await _take(iterator, size - len(head))
+    while chunk:
+        yield chunk
+        chunk = await _take(iterator, size)
+
+
+class AsyncCryptoURL:
+    """
+    Asyncio front of CryptoURL. Batches of up to inline_limit URLs are signed
+    right away, larger ones are split in chunks of chunk_size URLs signed on
+    executor, the loop's default thread pool if None.
+
+    Signing holds the GIL, so a thread pool keeps the loop responsive but
+    signs on one core; give a ProcessPoolExecutor to use several.
+    """
+
+    def __init__(  # pylint: disable=too-many-positional-arguments
+        self,
+        key,
+        executor=None,
+        inline_limit=64,
+        chunk_size=256,
+        max_pending=4,
+        **kwargs,
+    ):
+        """
+        :param key: secret key, or a CryptoURL to reuse.
+        :param executor: concurrent.futures executor signing large batches.
+        :param inline_limit: largest batch signed without the executor.
+        :param chunk_size: number of URLs signed per executor job.
+        :param max_pending: executor jobs in flight while iterating.
+        :param kwargs: CryptoURL arguments, such as cache_size or signer.
+        """
+        if isinstance(key, CryptoURL):
+            self.crypto = key
+        else:
+            self.crypto = CryptoURL(key, **kwargs)
+        self.executor = executor
+        self.inline_limit = inline_limit
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending
+
+    async def generate(self, **options):
+        """Generates an encrypted URL with the specified options"""
+
+        # one URL takes microseconds, less than handing it to the executor
+        return self.crypto.generate(**options)
+
+    async def generate_many(self, options_iterable):
+        """Generates one encrypted URL per item of options_iterable,
+        returned as a list in the same order"""
+
+        return [url async for url in self.iter_generate(options_iterable)]
+
+    async def iter_generate(self, options_iterable):
+        """
+        Lazily generates one encrypted URL per item of options_iterable, a
+        sync or async iterable, while the next chunks are signed on the
+        executor.
+        """
+
+        if hasattr(options_iterable, "__aiter__"):
+            iterator = aiter(options_iterable)
+        else:
+            iterator = iter(options_iterable)
+
+        # one item past inline_limit tells small batches apart
+        head = await _take(iterator, self.inline_limit + 1)
+        if len(head) <= self.inline_limit:
+            for url in self.crypto.iter_generate(head):
+                yield url
+            return
+
+        loop = asyncio.get_running_loop()
+        pending = deque()
+        chunks = _chunks(head, iterator, self.chunk_size)
+
+        try:
+            async for chunk in chunks:
+                if len(pending) >= self.max_pending:
+                    for url in await pending.popleft():
+                        yield url
+                pending.append(self._submit(loop, chunk))
+
+            while pending:
+                for url in await pending.popleft():
+                    yield url
+        finally:
+            for future in pending:
+                future.cancel()
+            await chunks.aclose()
+
+    def _submit(self, loop, chunk):
+        return loop.run_in_executor(self.executor, self.crypto.generate_many, chunk)
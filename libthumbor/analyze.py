@@ -0,0 +1,245 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""Counts the thumbor transformations requested in access logs.
+
+    libthumbor-analyze /var/log/nginx/access.log --top 20
+
+The log is memory-mapped and cut in chunks at line boundaries, parsed in
+parallel on every core. Any log where requests look like "GET /path",
+such as nginx's or thumbor's own, will do.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote
+
+from libthumbor.url import Url
+
+REQUEST_PATH = re.compile(rb"(?:GET|HEAD) (/[^\s?\"]*)")
+
+# bytes of log parsed per job, which also bounds the memory of each worker
+CHUNK_SIZE = 64 * 1024 * 1024
+
+# distinct urls whose counter keys are remembered while parsing a chunk
+SEEN_MAXSIZE = 65536
+
+
+class LogStats:
+    """Counters of the thumbor transformations of requested paths"""
+
+    COUNTERS = ("presets", "dimensions", "fit_in", "filters", "smart")
+
+    def __init__(self):
+        self.requests = 0
+        self.unparsed = 0
+        self.presets = Counter()
+        self.dimensions = Counter()
+        self.fit_in = Counter()
+        self.filters = Counter()
+        self.smart = Counter()
+
+    def add_paths(self, paths):
+        """Counts each of the paths, signature included"""
+        # counter keys of recently seen urls, as popular images repeat a lot
+        seen = {}
+
+        for path in paths:
+            self.requests += 1
+            _, separator, decrypted = path[1:].partition("/")
+
+            keys = seen.get(decrypted)
+            if keys is None:
+                keys = _counter_keys(decrypted) if separator else False
+                if len(seen) >= SEEN_MAXSIZE:
+                    seen.clear()
+                seen[decrypted] = keys
+
+            if not keys:
+                self.unparsed += 1
+                continue
+
+            preset, dimensions, fit_in, smart, filter_names = keys
+            self.presets[preset] += 1
+            self.dimensions[dimensions] += 1
+            self.fit_in[fit_in] += 1
+            self.smart[smart] += 1
+            if filter_names:
+                self.filters.update(filter_names)
+
+    def update(self, other):
+        """Adds the counts of another LogStats"""
+        self.requests += other.requests
+        self.unparsed += other.unparsed
+        for name in self.COUNTERS:
+            getattr(self, name).update(getattr(other, name))
+
+    def as_dict(self, top=None):
+        result = {"requests": self.requests, "unparsed": self.unparsed}
+        for name in self.COUNTERS:
+            result[name] = [
+                [str(value), count]
+                for value, count in getattr(self, name).most_common(top)
+            ]
+        return result
+
+
+def _counter_keys(decrypted):
+    """(preset, dimensions, fit-in, smart, filter names) of a url, or False"""
+    if "%" in decrypted:
+        decrypted = unquote(decrypted)
+
+    parsed = Url.parse_decrypted(decrypted, as_object=True)
+    if parsed is None or not decrypted.endswith(parsed.image):
+        return False
+
+    if not parsed.fit_in:
+        fit_in = "none"
+    else:
+        fit_in = (
+            f"{'adaptive-' if parsed.adaptive else ''}"
+            f"{'full-' if parsed.full else ''}fit-in"
+        )
+
+    return (
+        decrypted[: len(decrypted) - len(parsed.image)].rstrip("/"),
+        f"{'-' if parsed.horizontal_flip else ''}{parsed.width}"
+        f"x{'-' if parsed.vertical_flip else ''}{parsed.height}",
+        fit_in,
+        parsed.smart,
+        tuple(item.partition("(")[0] for item in parsed.filter_list),
+    )
+
+
+def iter_request_paths(buffer, start=0, end=None):
+    """Request paths, as str, found in the bytes of buffer[start:end]"""
+    end = len(buffer) if end is None else end
+    for match in REQUEST_PATH.finditer(buffer, start, end):
+        yield match.group(1).decode("utf-8", "replace")
+
+
+def chunk_offsets(buffer, chunk_size=CHUNK_SIZE):
+    """(start, end) offsets of chunks of about chunk_size bytes, ending lines"""
+    offsets = []
+    start = 0
+    size = len(buffer)
+
+    while start < size:
+        end = buffer.find(b"\n", min(start + chunk_size, size) - 1)
+        end = size if end == -1 else end + 1
+        offsets.append((start, end))
+        start = end
+
+    return offsets
+
+
+def analyze_chunk(path, start, end):
+    """LogStats of the lines of the file at path between two offsets"""
+    stats = LogStats()
+
+    with open(path, "rb") as stream:
+        with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            stats.add_paths(iter_request_paths(buffer, start, end))
+
+    return stats
+
+
+def analyze(path, workers=None, chunk_size=CHUNK_SIZE):
+    """LogStats of a whole log file, parsed on workers processes"""
+    workers = workers or os.cpu_count() or 1
+    stats = LogStats()
+
+    if os.path.getsize(path) == 0:
+        return stats
+
+    with open(path, "rb") as stream:
+        with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            offsets = chunk_offsets(buffer, chunk_size)
+
+    if workers == 1 or len(offsets) == 1:
+        for start, end in offsets:
+            stats.update(analyze_chunk(path, start, end))
+        return stats
+
+    with ProcessPoolExecutor(min(workers, len(offsets))) as executor:
+        futures = [
+            executor.submit(analyze_chunk, path, start, end) for start, end in offsets
+        ]
+        # merged in the log order, so that ties rank the same on every run
+        for future in futures:
+            stats.update(future.result())
+
+    return stats
+
+
+def format_report(stats, top):
+    lines = [
+        f"requests  {stats.requests:>12,}",
+        f"unparsed  {stats.unparsed:>12,}",
+    ]
+    parsed = stats.requests - stats.unparsed
+
+    for name in LogStats.COUNTERS:
+        lines.append("")
+        lines.append(f"{name.replace('_', '-')}:")
+        for value, count in getattr(stats, name).most_common(top):
+            share = count / parsed * 100 if parsed else 0
+            lines.append(
+                f"  {count:>12,}  {share:5.1f}%  {value if value != '' else '-'}"
+            )
+
+    return "\n".join(lines)
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="libthumbor-analyze",
+        description="Counts the thumbor transformations requested in an access log.",
+    )
+    parser.add_argument("log", help="access log file")
+    parser.add_argument(
+        "-n", "--top", type=int, default=10, help="values shown per counter"
+    )
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--json", action="store_true", help="print the counters as JSON"
+    )
+
+    arguments = parser.parse_args(argv)
+    if arguments.workers < 1 or arguments.top < 1:
+        parser.error("--workers and --top must be positive")
+    return arguments
+
+
+def main(argv=None):
+    arguments = parse_arguments(argv)
+
+    try:
+        stats = analyze(arguments.log, workers=arguments.workers)
+    except OSError as error:
+        sys.stderr.write(f"libthumbor-analyze: {error}\n")
+        return 1
+
+    if arguments.json:
+        sys.stdout.write(json.dumps(stats.as_dict(arguments.top)))
+    else:
+        sys.stdout.write(format_report(stats, arguments.top))
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""Signs large CSV or JSON lines files of URL options on every core.
+
+    THUMBOR_SECURITY_KEY=... libthumbor-bulk catalog.csv -o urls.txt
+
+Each input record holds the options of CryptoURL.generate(), image_url
+included, and gives one signed URL per output line, in the same order.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from libthumbor.crypto import CryptoURL
+from libthumbor.filters import parse_filters
+from libthumbor.url_signers import DEFAULT_URL_SIGNER
+
+BOOLEAN_OPTIONS = frozenset(
+    [
+        "adaptive_fit_in",
+        "adaptive_full_fit_in",
+        "debug",
+        "fit_in",
+        "flip",
+        "flop",
+        "full_fit_in",
+        "meta",
+        "smart",
+        "unsafe",
+    ]
+)
+TRUE_VALUES = frozenset(["1", "true", "yes", "on"])
+
+# the worker process' CryptoURL, set up once by _init_worker
+_CRYPTO = None
+
+
+def _crop(value):
+    """((left, top), (right, bottom)) of a "LxT:RxB" crop"""
+    first, _, second = value.partition(":")
+    left, _, top = first.partition("x")
+    right, _, bottom = second.partition("x")
+    return (int(left), int(top)), (int(right), int(bottom))
+
+
+def _dimension(name, value):
+    """int of a width or height, which the view would reject as well otherwise"""
+    if not value.lstrip("-").isdecimal():
+        raise ValueError(f"The {name} value '{value}' is not an integer.")
+    return int(value)
+
+
+def _trim(value):
+    if value.lower() in TRUE_VALUES:
+        return True
+    position, _, tolerance = value.partition(":")
+    return position, int(tolerance) if tolerance else None
+
+
+def coerce_options(options):
+    """
+    Converts the text values of a CSV row to CryptoURL.generate() options.
+    Empty values are dropped, and values already typed, as in JSON, are kept.
+    """
+    result = {}
+
+    for name, value in options.items():
+        if value is None or value == "":
+            continue
+
+        if isinstance(value, str):
+            if name in BOOLEAN_OPTIONS:
+                value = value.lower() in TRUE_VALUES
+            elif name in ("width", "height"):
+                value = _dimension(name, value)
+            elif name == "crop":
+                value = _crop(value)
+            elif name == "trim":
+                value = _trim(value)
+            elif name == "filters":
+                value = parse_filters(value)
+
+        result[name] = value
+
+    return result
+
+
+def _decode(record, input_format, fieldnames):
+    if input_format == "jsonl":
+        options = json.loads(record)
+        if not isinstance(options, dict):
+            raise ValueError("a JSON object of options is expected")
+        return coerce_options(options)
+    return coerce_options(dict(zip(fieldnames, record)))
+
+
+def _init_worker(key, signer):
+    global _CRYPTO  # pylint: disable=global-statement
+    _CRYPTO = CryptoURL(key, signer=signer)
+
+
+def _sign_chunk(first_line, records, input_format, fieldnames):
+    """Signs a chunk of raw records, decoded here to spare the parent process"""
+    lines = []
+    options = []
+
+    for line, record in enumerate(records, first_line):
+        if input_format == "jsonl" and not record.strip():
+            continue
+        try:
+            options.append(_decode(record, input_format, fieldnames))
+            lines.append(line)
+        except ValueError as error:
+            raise ValueError(f"line {line}: {error}") from None
+
+    try:
+        return _CRYPTO.generate_many(options)
+    except (ValueError, TypeError, KeyError, IndexError):
+        pass
+
+    # sign one by one to find the record at fault
+    urls = []
+    for line, item in zip(lines, options):
+        try:
+            urls.append(_CRYPTO.generate(**item))
+        except (ValueError, TypeError, KeyError, IndexError) as error:
+            raise ValueError(f"line {line}: {error}") from None
+
+    return urls
+
+
+def read_records(stream, input_format):
+    """
+    (fieldnames, records, first_line) of an input stream. Records stay raw
+    JSON lines, or become CSV rows, as CSV fields may span lines.
+    """
+    if input_format == "jsonl":
+        # blank lines are skipped by the workers, to keep the line numbers
+        return None, stream, 1
+
+    reader = csv.reader(stream)
+    fieldnames = next(reader, [])
+    return fieldnames, reader, 2
+
+
+class Progress:
+    """Reports the signed URLs and the throughput at most every interval"""
+
+    def __init__(self, stream=sys.stderr, interval=1.0, timer=time.monotonic):
+        self.stream = stream
+        self.interval = interval
+        self.timer = timer
+        self.started = timer()
+        self.reported = self.started
+        self.count = 0
+
+    def update(self, count):
+        self.count += count
+        now = self.timer()
+        if now - self.reported >= self.interval:
+            self.reported = now
+            self.report("signed", now)
+
+    def report(self, verb, now=None):
+        elapsed = (self.timer() if now is None else now) - self.started
+        rate = self.count / elapsed if elapsed > 0 else 0
+        self.stream.write(f"{verb} {self.count:,} urls ({rate:,.0f} urls/s)\n")
+        self.stream.flush()
+
+
+def iter_sign(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    records,
+    key,
+    input_format="jsonl",
+    fieldnames=None,
+    signer=DEFAULT_URL_SIGNER,
+    workers=None,
+    chunk_size=1000,
+    first_line=1,
+):
+    """
+    Yields lists of signed URLs, one per chunk of records, in order. Chunks
+    are signed by a pool of workers processes each holding one CryptoURL,
+    with at most two chunks per worker in flight, so memory stays bounded
+    whatever the input size. workers=1 signs in this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    records = iter(records)
+
+    def chunks():
+        line = first_line
+        chunk = list(islice(records, chunk_size))
+        while chunk:
+            yield line, chunk
+            line += len(chunk)
+            chunk = list(islice(records, chunk_size))
+
+    if workers == 1:
+        _init_worker(key, signer)
+        for line, chunk in chunks():
+            yield _sign_chunk(line, chunk, input_format, fieldnames)
+        return
+
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(key, signer)
+    ) as executor:
+        pending = deque()
+        try:
+            for line, chunk in chunks():
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+                pending.append(
+                    executor.submit(_sign_chunk, line, chunk, input_format, fieldnames)
+                )
+
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _input_format(path, input_format):
+    if input_format:
+        return input_format
+    if path.endswith(".csv"):
+        return "csv"
+    return "jsonl"
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="libthumbor-bulk",
+        description="Signs the thumbor URLs of a CSV or JSON lines file of options.",
+    )
+    parser.add_argument("input", help="CSV or JSON lines file, - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="- for stdout")
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=["csv", "jsonl"],
+        help="input format, guessed from the file extension by default",
+    )
+    parser.add_argument(
+        "-k",
+        "--key",
+        default=os.environ.get("THUMBOR_SECURITY_KEY"),
+        help="security key, THUMBOR_SECURITY_KEY by default",
+    )
+    parser.add_argument(
+        "-s", "--signer", default=DEFAULT_URL_SIGNER, help="url signer module"
+    )
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("-c", "--chunk-size", type=int, default=1000)
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="don't report the progress"
+    )
+
+    arguments = parser.parse_args(argv)
+    if not arguments.key:
+        parser.error("a security key is required (--key or THUMBOR_SECURITY_KEY)")
+    if arguments.workers < 1 or arguments.chunk_size < 1:
+        parser.error("--workers and --chunk-size must be positive")
+    return arguments
+
+
+def _open(path, mode):
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, encoding="utf-8", newline="" if "r" in mode else None)
+
+
+def main(argv=None):
+    arguments = parse_arguments(argv)
+    input_format = _input_format(arguments.input, arguments.format)
+    progress = None if arguments.quiet else Progress()
+
+    source = _open(arguments.input, "r")
+    output = _open(arguments.output, "w")
+    try:
+        fieldnames, records, first_line = read_records(source, input_format)
+        for urls in iter_sign(
+            records,
+            arguments.key,
+            input_format,
+            fieldnames,
+            signer=arguments.signer,
+            workers=arguments.workers,
+            chunk_size=arguments.chunk_size,
+            first_line=first_line,
+        ):
+            # chunks of blank lines sign nothing, and mustn't print empty lines
+            if not urls:
+                continue
+            output.write("\n".join(urls))
+            output.write("\n")
+            if progress is not None:
+                progress.update(len(urls))
+    except ValueError as error:
+        sys.stderr.write(f"libthumbor-bulk: {error}\n")
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+    if progress is not None:
+        progress.report("done,")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
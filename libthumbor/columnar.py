@@ -0,0 +1,107 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""Signs whole columns of image urls with one option preset.
+
+    urls = sign_column(crypto, df["image_url"], fit_in=True, width=300, height=200)
+
+Lists, NumPy arrays, pandas Series and pyarrow arrays are recognized by their
+methods, so none of those libraries is required, and a column of the same
+kind is returned. Missing values (None, NaN, nulls) stay missing.
+"""
+
+import base64
+from importlib import import_module
+
+
+def _values(column):
+    """Python list of the values of any supported column"""
+    if hasattr(column, "to_pylist"):  # pyarrow Array and ChunkedArray
+        return column.to_pylist()
+    if hasattr(column, "tolist"):  # NumPy arrays and pandas Series
+        return column.tolist()
+    return list(column)
+
+
+def _like(column, urls):
+    """urls as a column of the same kind as column"""
+    package = type(column).__module__.partition(".")[0]
+
+    if package == "pandas" and hasattr(column, "index"):
+        return type(column)(urls, index=column.index, name=column.name, dtype=object)
+
+    if package == "numpy":
+        return import_module("numpy").array(urls, dtype=object)
+
+    if package == "pyarrow":
+        pyarrow = import_module("pyarrow")
+        if hasattr(column, "chunks"):
+            return pyarrow.chunked_array([urls], type=pyarrow.string())
+        return pyarrow.array(urls, type=pyarrow.string())
+
+    return urls
+
+
+def sign_urls(crypto, image_urls, **options):
+    """
+    List of the urls of every image url with the same options, None for
+    missing image urls. The options are serialized once, and so is the
+    signing state of the shared url prefix when the signer allows it.
+    """
+    template = crypto.template(**options)
+
+    if template.state is None:
+        return [
+            None if _missing(image_url) else template(_text(image_url))
+            for image_url in image_urls
+        ]
+
+    prefix = template.prefix
+    copy = template.state.copy
+    b64encode = base64.urlsafe_b64encode
+    urls = []
+
+    for image_url in image_urls:
+        if type(image_url) is not str:  # pylint: disable=unidiomatic-typecheck
+            if _missing(image_url):
+                urls.append(None)
+                continue
+            image_url = _text(image_url)
+
+        hasher = copy()
+        hasher.update(image_url.encode("utf-8"))
+        signature = b64encode(hasher.digest()).decode("ascii")
+        urls.append(f"/{signature}/{prefix}{image_url}")
+
+    return urls
+
+
+def sign_column(crypto, column, **options):
+    """
+    Signed urls of a column of image urls (list, NumPy array, pandas Series
+    or pyarrow array), returned as a column of the same kind.
+    """
+    return _like(column, sign_urls(crypto, _values(column), **options))
+
+
+def _missing(value):
+    if value is None:
+        return True
+    try:
+        # NaN is the only value not equal to itself
+        return bool(value != value)  # pylint: disable=comparison-with-itself
+    except TypeError:
+        return True  # pandas.NA, whose comparisons are NA, which has no truth
+
+
+def _text(value):
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return str(value)
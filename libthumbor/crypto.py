@@ -10,43 +10,349 @@
 
 """Encrypted URLs for thumbor encryption."""
 
-from __future__ import absolute_import
-
 import base64
-import hashlib
-import hmac
+from functools import lru_cache
+
+from libthumbor import instrumentation
+from libthumbor.url import get_url_parts, plain_image_url, unsafe_url
+from libthumbor.url_signers.base64_hmac_sha1 import UrlSigner
+
+# prefixes memoized by iter_generate, so long streams keep a bounded memory
+_PREFIXES_MAXSIZE = 1024
+
+# option prefixes whose hashing state is kept, across every CryptoURL
+_PREFIX_STATES_MAXSIZE = 256
+
+
+@lru_cache(maxsize=_PREFIX_STATES_MAXSIZE)
+def _prefix_state(hasher, prefix):
+    """
+    Copy of the keyed hasher having already hashed the serialized options
+    prefix, to be copied again before use. Keyed hashers are shared by every
+    signer of the same key, so URLs with the same options share their state.
+    """
+    state = hasher.copy()
+    state.update(prefix.encode("utf-8"))
+    return state
+
+
+def _signature(state, image_url):
+    """base64 signature of image_url hashed from a _prefix_state"""
+    hasher = state.copy()
+    hasher.update(image_url)
+    return base64.urlsafe_b64encode(hasher.digest())
+
+
+def _freeze(value):
+    """
+    Hashable value keeping the types of the nested items, as 300 == 300.0
+    but both render apart
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple((type(item), _freeze(item)) for item in value)
+    return value
 
-from six import b, text_type
 
-from libthumbor.url import plain_image_url, unsafe_url
+def _prefix_key(options, scratch):
+    """
+    Hashable key for every option except image_url, or None if unhashable.
+    scratch is an empty dict reused from call to call.
+    """
+    scratch.update(options)
+    del scratch["image_url"]
+
+    # the value types are part of the key, as 300 == 300.0 but both render apart,
+    # and so are the types nested in lists and tuples
+    types = tuple(map(type, scratch.values()))
+    if list in types or tuple in types:
+        for name, value in scratch.items():
+            if isinstance(value, (list, tuple)):
+                scratch[name] = _freeze(value)
+
+    key = (tuple(scratch.items()), types)
+    scratch.clear()
+
+    try:
+        hash(key)
+    except TypeError:
+        return None
+
+    return key
+
+
+def _cache_key(options):
+    """Hashable key for the whole option set regardless of the options order"""
+    key = tuple(
+        (name, type(value), _freeze(value)) for name, value in sorted(options.items())
+    )
+
+    try:
+        hash(key)
+    except TypeError:
+        return None
+
+    return key
 
 
 class CryptoURL:
     """Class responsible for generating encrypted URLs for thumbor"""
 
-    def __init__(self, key):
+    def __init__(self, key, cache_size=None, cache_ttl=None, signer=UrlSigner):
         """
         Initializes the encryptor with the proper key
         :param key: secret key to use for hashing.
+        :param cache_size: number of signed URLs to memoize, disabled if None.
+        :param cache_ttl: seconds a memoized URL is kept, forever if None.
+        :param signer: UrlSigner class of any libthumbor.url_signers module,
+            or its module name, hmac-sha1 by default.
         """
 
-        if isinstance(key, text_type):
-            key = b(key)
+        # pylint: disable=import-outside-toplevel
+        # signer loading and caching are imported when used, for cold starts
+        if isinstance(key, str):
+            key = key.encode("latin-1")
+        if isinstance(signer, str):
+            from libthumbor.url_signers import load as load_signer
+
+            signer = load_signer(signer)
         self.key = key
-        self.hmac = hmac.new(self.key, digestmod=hashlib.sha1)
+        self.signer = signer(key)
+        # keyed hasher shared by every signer of the key, None if it has none
+        self._hasher = getattr(self.signer, "_hasher", None)
+        self.cache = None
+        if cache_size:
+            from libthumbor.cache import LRUCache
+
+            self.cache = LRUCache(cache_size, ttl=cache_ttl)
+
+    @property
+    def hmac(self):
+        """Copy of the signer's keyed hasher, None if the signer has none"""
+        return self._hasher.copy() if self._hasher is not None else None
+
+    @hmac.setter
+    def hmac(self, hasher):
+        self._hasher = hasher
+
+    def __reduce__(self):
+        # hashers can't be pickled, so process pools get a fresh CryptoURL
+        # built from the same arguments, with an empty cache
+        cache_size = self.cache.maxsize if self.cache is not None else None
+        cache_ttl = self.cache.ttl if self.cache is not None else None
+        return (
+            self.__class__,
+            (self.key, cache_size, cache_ttl, type(self.signer)),
+        )
 
     def generate_new(self, options):
-        url = plain_image_url(**options)
-        _hmac = self.hmac.copy()
-        _hmac.update(text_type(url).encode("utf-8"))
-        signature = base64.urlsafe_b64encode(_hmac.digest()).decode("ascii")
+        if self.cache is not None:
+            key = _cache_key(options)
+            if key is not None:
+                url = self.cache.get(key)
+                current = instrumentation.hooks
+                if current is not None:
+                    current.cache("generate", url is not None)
+                if url is None:
+                    url = self._generate_new(options)
+                    self.cache.set(key, url)
+                return url
+
+        return self._generate_new(options)
+
+    def _generate_new(self, options):
+        if self._hasher is None:
+            url = plain_image_url(**options)
+            return f"/{self.signature(url)}/{url}"
 
+        url_parts = get_url_parts(**options)
+        url_parts.append("")
+        prefix = "/".join(url_parts)
+        image_url = options["image_url"]
+        url = prefix + image_url
+
+        state = _prefix_state(self._hasher, prefix)
+        signature = _signature(state, image_url.encode("utf-8")).decode("ascii")
         return f"/{signature}/{url}"
 
+    def signature(self, url):
+        """Returns the base64 signature of an already composed URL"""
+
+        return self.signer.signature(url).decode("ascii")
+
+    def template(self, **options):
+        """Compiles options into a UrlTemplate signing URLs for any image_url"""
+
+        return UrlTemplate(self, **options)
+
+    def cache_info(self):
+        """Returns the hits, misses and evictions of the signed URLs cache"""
+
+        if self.cache is None:
+            return None
+
+        return self.cache.info()
+
     def generate(self, **options):
         """Generates an encrypted URL with the specified options"""
 
+        current = instrumentation.hooks
+        if current is not None:
+            return instrumentation.timed(current, "generate", self._generate, options)
+
+        return self._generate(options)
+
+    def _generate(self, options):
         if options.get("unsafe", False):
             return unsafe_url(**options)
 
         return self.generate_new(options)
+
+    def generate_bytes(self, **options):
+        """
+        Generates an encrypted URL as bytes. image_url may be given as str,
+        bytes or memoryview, and is hashed and copied as is, without
+        decoding. The signed URLs cache isn't used.
+        """
+
+        signature, path = self._signed_path(options)
+        if signature is None:
+            return b"unsafe/" + path
+
+        return b"/%b/%b" % (signature, path)
+
+    def sign_into(self, buffer, **options):
+        """
+        Appends the encrypted URL of generate_bytes() to buffer, a
+        bytearray, and returns the number of bytes written
+        """
+
+        signature, path = self._signed_path(options)
+        size = len(buffer)
+
+        if signature is None:
+            buffer += b"unsafe/"
+        else:
+            buffer += b"/"
+            buffer += signature
+            buffer += b"/"
+        buffer += path
+
+        return len(buffer) - size
+
+    def _signed_path(self, options):
+        """(signature, None if unsafe, and path) of an URL, as bytes"""
+        url_parts = get_url_parts(**options)
+        image_url = options["image_url"]
+        if isinstance(image_url, str):
+            image_url = image_url.encode("utf-8")
+
+        url_parts.append("")
+        prefix = "/".join(url_parts)
+        path = prefix.encode("utf-8") + image_url
+
+        if options.get("unsafe", False):
+            return None, path
+
+        if self._hasher is None:
+            signature = self.signer.signature(path.decode("utf-8"))
+            if isinstance(signature, str):
+                signature = signature.encode("ascii")
+            return signature, path
+
+        return _signature(_prefix_state(self._hasher, prefix), image_url), path
+
+    def generate_many(self, options_iterable):
+        """Generates one encrypted URL per item of options_iterable,
+        returned as a list in the same order"""
+
+        return list(self.iter_generate(options_iterable))
+
+    def iter_generate(self, options_iterable):
+        """
+        Lazily generates one encrypted URL per item of options_iterable.
+
+        Items sharing the same options (apart from image_url) are validated
+        and serialized only once, and only the last option sets seen are
+        remembered, so memory doesn't grow with the number of items.
+        """
+
+        if self.cache is not None:
+            for options in options_iterable:
+                yield self.generate(**options)
+            return
+
+        sign = self.signer.signature
+        hasher = self._hasher
+        prefixes = {}
+        scratch = {}
+
+        for options in options_iterable:
+            if options.get("unsafe", False):
+                yield unsafe_url(**options)
+                continue
+
+            key = _prefix_key(options, scratch) if "image_url" in options else None
+            memoized = prefixes.get(key) if key is not None else None
+
+            if memoized is None:
+                prefix = "".join(f"{part}/" for part in get_url_parts(**options))
+                state = _prefix_state(hasher, prefix) if hasher is not None else None
+                memoized = prefix, state
+                if key is not None:
+                    if len(prefixes) >= _PREFIXES_MAXSIZE:
+                        prefixes.clear()
+                    prefixes[key] = memoized
+
+            prefix, state = memoized
+            image_url = options["image_url"]
+            url = f"{prefix}{image_url}"
+
+            if state is None:
+                signature = sign(url)
+            else:
+                signature = _signature(state, str(image_url).encode("utf-8"))
+
+            yield f"/{signature.decode('ascii')}/{url}"
+
+
+class UrlTemplate:
+    """
+    Preset of options validated and serialized once, then called with only
+    the image_url to get its URL:
+
+        thumbnail = crypto.template(fit_in=True, width=300, height=200)
+        url = thumbnail("my.server.com/image.jpg")
+    """
+
+    def __init__(self, crypto, **options):
+        if "image_url" in options:
+            raise ValueError("The image_url argument is not allowed in templates.")
+
+        self.crypto = crypto
+        self.options = options
+        self.unsafe = options.get("unsafe", False)
+        self.prefix = "".join(
+            f"{part}/" for part in get_url_parts(image_url="", **options)
+        )
+        # hashing state of the prefix, None if unsafe or the signer has none
+        self.state = None
+        hasher = crypto._hasher  # pylint: disable=protected-access
+        if not self.unsafe and hasher is not None:
+            self.state = _prefix_state(hasher, self.prefix)
+
+    def __call__(self, image_url):
+        url = f"{self.prefix}{image_url}"
+
+        if self.unsafe:
+            return f"unsafe/{url}"
+
+        if self.state is None:
+            return f"/{self.crypto.signature(url)}/{url}"
+
+        signature = _signature(self.state, str(image_url).encode("utf-8"))
+        return f"/{signature.decode('ascii')}/{url}"
+
+    def generate_many(self, image_urls):
+        """Generates one URL per image url, returned as a list in the same order"""
+
+        return [self(image_url) for image_url in image_urls]
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from libthumbor.django.views import agenerate_url, agenerate_urls
+
+urlpatterns = [  # pylint: disable=invalid-name
+    path("gen_url/", agenerate_url, name="generate_thumbor_url"),
+    path("gen_urls/", agenerate_urls, name="generate_thumbor_urls"),
+]
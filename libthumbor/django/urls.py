@@ -1,7 +1,8 @@
 from django.urls import path
 
-from libthumbor.django.views import generate_url
+from libthumbor.django.views import generate_url, generate_urls
 
 urlpatterns = [  # pylint: disable=invalid-name
     path("gen_url/", generate_url, name="generate_thumbor_url"),
+    path("gen_urls/", generate_urls, name="generate_thumbor_urls"),
 ]
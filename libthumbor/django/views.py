@@ -10,41 +10,247 @@
 
 """Generic view for create thumbor encrypted urls."""
 
+import asyncio
+import hashlib
+import json
 import logging
+from functools import lru_cache
 
 from django.conf import settings
-from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseNotAllowed,
+    JsonResponse,
+)
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 
+from libthumbor.cache import LRUCache
 from libthumbor.crypto import CryptoURL
+from libthumbor.url_signers import DEFAULT_URL_SIGNER
 
 logger = logging.getLogger(__name__)
 
-THUMBOR_SECURITY_KEY = getattr(settings, "THUMBOR_SECURITY_KEY", "my-security-key")
+# defaults of the settings, which get_settings() reads once per process and
+# again only when Django sends setting_changed, as override_settings does
+DEFAULT_SECURITY_KEY = "my-security-key"
+DEFAULT_SERVER = "http://localhost:8888/"
+# number of generated urls kept per process, 0 to disable
+DEFAULT_RESPONSE_CACHE_SIZE = 1024
+# number of option sets accepted by generate_urls per request
+DEFAULT_BATCH_MAX_SIZE = 1000
+# larger batches are signed off the event loop by agenerate_urls
+ASYNC_INLINE_LIMIT = 64
 
-THUMBOR_SERVER = getattr(settings, "THUMBOR_SERVER", "http://localhost:8888/")
 INVALID_PARAMS_MESSAGE = "Invalid thumbor URL parameters."
+INVALID_BATCH_MESSAGE = "The request body must be a JSON array of options."
+INVALID_ITEM_MESSAGE = "Each item must be a JSON object of options."
+
+# responses of generate_url by query string, created with the configured size
+# on first use, or False when disabled
+_RESPONSES = None
+
+
+@lru_cache(maxsize=8)
+def get_crypto(security_key, signer=DEFAULT_URL_SIGNER):
+    """CryptoURL shared by every request signing with the same settings"""
+    return CryptoURL(security_key, signer=signer)
+
+
+@lru_cache(maxsize=1)
+def get_settings():
+    """(security key, server, signer, Cache-Control, use ETags) settings"""
+    return (
+        getattr(settings, "THUMBOR_SECURITY_KEY", DEFAULT_SECURITY_KEY),
+        getattr(settings, "THUMBOR_SERVER", DEFAULT_SERVER),
+        # same module names as thumbor's URL_SIGNER setting
+        getattr(settings, "THUMBOR_URL_SIGNER", DEFAULT_URL_SIGNER),
+        getattr(settings, "THUMBOR_CACHE_CONTROL", None),
+        getattr(settings, "THUMBOR_USE_ETAGS", True),
+    )
+
+
+def __getattr__(name):
+    # THUMBOR_SECURITY_KEY and THUMBOR_SERVER used to be read into this module
+    # at import time, they are still available as the current settings
+    if name == "THUMBOR_SECURITY_KEY":
+        return get_settings()[0]
+    if name == "THUMBOR_SERVER":
+        return get_settings()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _response_cache():
+    global _RESPONSES  # pylint: disable=global-statement
+    if _RESPONSES is None:
+        size = getattr(
+            settings, "THUMBOR_RESPONSE_CACHE_SIZE", DEFAULT_RESPONSE_CACHE_SIZE
+        )
+        _RESPONSES = LRUCache(size) if size else False
+    return _RESPONSES
+
+
+@receiver(setting_changed)
+def clear_caches(setting, **kwargs):  # pylint: disable=unused-argument
+    """Drops the cached settings, signers and responses when a THUMBOR_ setting
+    changes"""
+    global _RESPONSES  # pylint: disable=global-statement
+    if setting.startswith("THUMBOR_"):
+        get_settings.cache_clear()
+        get_crypto.cache_clear()
+        _RESPONSES = None
 
 
 def generate_url(request):
     if request.method != "GET":
         return HttpResponseNotAllowed(["GET"])
 
-    crypto = CryptoURL(THUMBOR_SECURITY_KEY)
+    return _url_response(request)
+
+
+async def agenerate_url(request):
+    """generate_url for ASGI, signing on the event loop without a thread hop"""
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+
+    return _url_response(request)
+
+
+def _url_response(request):
+    security_key, server, signer, cache_control, use_etags = get_settings()
+
+    cache = _response_cache()
+    key = (security_key, server, signer, request.META.get("QUERY_STRING", ""))
+    cached = cache.get(key) if cache is not False else None
+
+    if cached is None:
+        try:
+            url = _generate_url(request.GET, get_crypto(security_key, signer), server)
+        except ValueError as error:
+            return HttpResponseBadRequest(str(error))
+
+        body = url.encode("utf-8")
+        cached = (
+            body,
+            quote_etag(hashlib.md5(body, usedforsecurity=False).hexdigest()),
+        )
+        if cache is not False:
+            cache.set(key, cached)
+
+    body, etag = cached
+    response = HttpResponse(body, content_type="text/plain")
+
+    if cache_control:
+        response["Cache-Control"] = cache_control
+
+    if use_etags:
+        response["ETag"] = etag
+        return get_conditional_response(request, etag=etag, response=response)
+
+    return response
+
+
+def generate_urls(request):
+    """
+    Signs each option set of a JSON array posted in the request body, and
+    returns a JSON array of their urls in the same order. Items that can't be
+    signed are reported in place as {"error": message}.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    items = _batch_items(request)
+    if isinstance(items, HttpResponse):
+        return items
+
+    return JsonResponse(_batch_urls(items), safe=False)
 
-    args = request.GET
-    args = dict(zip(map(str, args.keys()), args.values()))
+
+async def agenerate_urls(request):
+    """
+    generate_urls for ASGI. Batches of more than ASYNC_INLINE_LIMIT items
+    are signed in the default executor, so they don't block the event loop.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    items = _batch_items(request)
+    if isinstance(items, HttpResponse):
+        return items
+
+    if len(items) > ASYNC_INLINE_LIMIT:
+        loop = asyncio.get_running_loop()
+        urls = await loop.run_in_executor(None, _batch_urls, items)
+    else:
+        urls = _batch_urls(items)
+
+    return JsonResponse(urls, safe=False)
+
+
+def _batch_items(request):
+    """Option sets posted to generate_urls, or the response to a bad request"""
+    try:
+        items = json.loads(request.body)
+    except ValueError:
+        items = None
+
+    if not isinstance(items, list):
+        return HttpResponseBadRequest(INVALID_BATCH_MESSAGE)
+
+    max_size = getattr(settings, "THUMBOR_BATCH_MAX_SIZE", DEFAULT_BATCH_MAX_SIZE)
+    if len(items) > max_size:
+        return HttpResponseBadRequest(
+            f"At most {max_size} option sets can be signed per request."
+        )
+
+    return items
+
+
+def _batch_urls(items):
+    security_key, server, signer, _, _ = get_settings()
+    crypto = get_crypto(security_key, signer)
+
+    return [_batch_url(item, crypto, server) for item in items]
+
+
+def _batch_url(item, crypto, server):
+    if not isinstance(item, dict):
+        return {"error": INVALID_ITEM_MESSAGE}
+
+    try:
+        return _generate_url(item, crypto, server)
+    except ValueError as error:
+        return {"error": " ".join(str(error).split())}
+
+
+def _integer(value):
+    """int of a query string or JSON number, or ValueError if it isn't one"""
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(f"{value!r} is not an integer")
+    return int(value)
+
+
+def parse_options(query):
+    """
+    CryptoURL.generate() options of a QueryDict, or of a dict of strings or
+    JSON values, or ValueError with the message shown to the client.
+    """
+    args = dict(zip(map(str, query.keys()), query.values()))
     error_message = None
 
     try:
         if "width" in args:
-            args["width"] = int(args["width"])
-    except ValueError:
+            args["width"] = _integer(args["width"])
+    except (TypeError, ValueError, OverflowError):
         error_message = f"The width value '{args['width']}' is not an integer."
 
     try:
         if "height" in args:
-            args["height"] = int(args["height"])
-    except ValueError:
+            args["height"] = _integer(args["height"])
+    except (TypeError, ValueError, OverflowError):
         error_message = f"The height value '{args['height']}' is not an integer."
 
     try:
@@ -55,8 +261,8 @@ def generate_url(request):
             or "crop_bottom" in args
         ):
             args["crop"] = (
-                (int(args["crop_left"]), int(args["crop_top"])),
-                (int(args["crop_right"]), int(args["crop_bottom"])),
+                (_integer(args["crop_left"]), _integer(args["crop_top"])),
+                (_integer(args["crop_right"]), _integer(args["crop_bottom"])),
             )
     except KeyError:
         error_message = """
@@ -64,7 +270,7 @@ def generate_url(request):
             Expected all 'crop_left', 'crop_top',
             'crop_right', 'crop_bottom' values.
         """
-    except ValueError:
+    except (TypeError, ValueError, OverflowError):
         error_message = """
             Invalid values for cropping.
             Expected all 'crop_left', 'crop_top',
@@ -72,14 +278,21 @@ def generate_url(request):
         """
 
     if error_message is not None:
-        logger.warning(error_message)
-        return HttpResponseBadRequest(error_message)
+        raise ValueError(error_message)
+
+    return args
+
 
+def _generate_url(query, crypto, server):
+    """Signed url of the query's options, or ValueError for the client"""
     try:
-        return HttpResponse(
-            THUMBOR_SERVER + crypto.generate(**args).strip("/"),
-            content_type="text/plain",
-        )
-    except (ValueError, KeyError) as error:
+        args = parse_options(query)
+    except ValueError as error:
+        logger.warning(str(error))
+        raise
+
+    try:
+        return server + crypto.generate(**args).strip("/")
+    except (ValueError, LookupError, TypeError) as error:
         logger.warning("Invalid thumbor URL parameters: %s", error)
-        return HttpResponseBadRequest(INVALID_PARAMS_MESSAGE)
+        raise ValueError(INVALID_PARAMS_MESSAGE) from None
@@ -0,0 +1,188 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""Filter model to build and inspect thumbor filter pipelines."""
+
+import sys
+from functools import lru_cache
+
+# minimum and maximum number of arguments of the filters bundled with thumbor,
+# other names are left alone as thumbor accepts custom filters
+THUMBOR_FILTERS = {
+    "autojpg": (0, 1),
+    "background_color": (1, 1),
+    "blur": (1, 2),
+    "brightness": (1, 1),
+    "contrast": (1, 1),
+    "convolution": (2, 3),
+    "cover": (0, 0),
+    "curve": (4, 4),
+    "equalize": (0, 0),
+    "extract_focal": (0, 0),
+    "fill": (1, 2),
+    "focal": (1, 1),
+    "format": (1, 1),
+    "grayscale": (0, 0),
+    "max_age": (1, 1),
+    "max_bytes": (1, 1),
+    "no_upscale": (0, 0),
+    "noise": (1, 2),
+    "proportion": (1, 1),
+    "quality": (1, 1),
+    "red_eye": (0, 0),
+    "rgb": (3, 3),
+    "rotate": (1, 1),
+    "round_corner": (4, 5),
+    "saturation": (1, 1),
+    "sharpen": (3, 3),
+    "stretch": (0, 0),
+    "strip_exif": (0, 0),
+    "strip_icc": (0, 0),
+    "upscale": (0, 0),
+    "watermark": (4, 6),
+}
+
+
+def _split(text, separator):
+    result = []
+    depth = 0
+    start = 0
+
+    for index, char in enumerate(text):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth = max(depth - 1, 0)
+        elif char == separator and depth == 0:
+            result.append(text[start:index])
+            start = index + 1
+
+    if text:
+        result.append(text[start:])
+
+    return result
+
+
+def split_filters(filters):
+    """Splits "a(1):b(x:y)" into ["a(1)", "b(x:y)"], minding parentheses"""
+    return _split(filters, ":")
+
+
+def _typed(argument):
+    """int or float of a numeric argument, as long as it renders back the same"""
+    if not argument[-1:].isdigit():
+        # not a number, or one such as "inf" or "1e3" that wouldn't render back
+        return argument
+
+    for kind in (int, float):
+        try:
+            value = kind(argument)
+        except ValueError:
+            continue
+        if str(value) == argument:
+            return value
+
+    return argument
+
+
+class Filter(str):
+    """
+    One thumbor filter, such as Filter("quality", 80). It is the str of its
+    url form, "quality(80)", with its name and arguments as attributes.
+    """
+
+    def __new__(cls, name, *args):
+        if not name:
+            raise ValueError("The filter name is mandatory.")
+
+        arity = THUMBOR_FILTERS.get(name)
+        if arity is not None and not arity[0] <= len(args) <= arity[1]:
+            minimum, maximum = arity
+            expected = minimum if minimum == maximum else f"{minimum} to {maximum}"
+            raise ValueError(
+                f"Wrong number of arguments for the {name} filter: "
+                f"expected {expected}, got {len(args)}."
+            )
+
+        value = str.__new__(cls, f"{name}({','.join(str(arg) for arg in args)})")
+        value.name = name
+        value.args = args
+        return value
+
+    def __getnewargs__(self):
+        return (self.name, *self.args)
+
+    def __repr__(self):
+        return f"Filter({', '.join(repr(item) for item in self.__getnewargs__())})"
+
+    @classmethod
+    def parse(cls, text):
+        """Parses "name(arg,arg)", with numeric arguments as int or float"""
+        name, parenthesis, arguments = text.partition("(")
+        if not parenthesis or not arguments.endswith(")"):
+            raise ValueError(f"Invalid filter: {text!r}.")
+
+        return cls(name, *[_typed(arg) for arg in _split(arguments[:-1], ",")])
+
+
+class FilterChain(tuple):
+    """
+    Immutable pipeline of Filter items, usable as the filters argument of
+    CryptoURL.generate() and Url.generate_options(). Its url form is built
+    once and interned.
+    """
+
+    # url form of the chain, set by __new__
+    serialized = ""
+
+    def __new__(cls, filters=()):
+        if isinstance(filters, str):
+            filters = split_filters(filters)
+
+        chain = tuple.__new__(
+            cls,
+            [
+                item if isinstance(item, Filter) else Filter.parse(item)
+                for item in filters
+            ],
+        )
+        chain.serialized = sys.intern(":".join(chain))
+        return chain
+
+    def __str__(self):
+        return self.serialized
+
+    def __repr__(self):
+        return f"FilterChain({list(self)!r})"
+
+    def __add__(self, other):
+        if isinstance(other, Filter):
+            other = [other]
+        return FilterChain([*self, *FilterChain(other)])
+
+    @property
+    def names(self):
+        return [item.name for item in self]
+
+    def get(self, name, default=None):
+        """The first filter called name"""
+        for item in self:
+            if item.name == name:
+                return item
+        return default
+
+
+@lru_cache(maxsize=256)
+def parse_filters(text):
+    """
+    Parses "name(arg):name(arg)" into a FilterChain. The chains of the most
+    recently parsed strings are cached, so common ones are parsed only once.
+    """
+    return FilterChain(split_filters(text))
@@ -0,0 +1,205 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""Optional hooks timing URL generation, parsing and validation.
+
+    counters = Counters()
+    instrumentation.install(counters)
+    ...
+    print(counters.prometheus())
+
+CryptoURL.generate, url_for, Url.parse_decrypted and the validate method of
+url signers report to the installed hooks. While none is installed they only
+check that hooks is None.
+"""
+
+# imported by url and crypto, so only what instrumenting needs is imported
+# here, and the Counters dependencies when they are created
+# pylint: disable=import-outside-toplevel
+
+from time import perf_counter
+
+# the installed Hooks, None while instrumentation is disabled
+hooks = None  # pylint: disable=invalid-name
+
+# upper bounds, in seconds, of the latency histogram buckets
+BUCKETS = (
+    0.000001,
+    0.0000025,
+    0.000005,
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.001,
+    float("inf"),
+)
+
+
+class Hooks:
+    """Instrumentation hooks doing nothing, to be overridden"""
+
+    def observe(self, operation, seconds):
+        """Called once per call of an instrumented operation"""
+
+    def cache(self, operation, hit):
+        """Called on each lookup of the signed URLs cache of CryptoURL"""
+
+    def validation_failure(self, reason):
+        """Called when a signature is rejected: missing, malformed or mismatch"""
+
+
+def install(new_hooks):
+    """Reports to new_hooks from now on, returns the hooks they replace"""
+    global hooks  # pylint: disable=global-statement,invalid-name
+    previous, hooks = hooks, new_hooks
+    return previous
+
+
+def uninstall():
+    """Disables instrumentation, returns the hooks that were installed"""
+    return install(None)
+
+
+class _Installed:
+    def __init__(self, new_hooks):
+        self.new_hooks = new_hooks
+        self.previous = None
+
+    def __enter__(self):
+        self.previous = install(self.new_hooks)
+        return self.new_hooks
+
+    def __exit__(self, *exc_info):
+        install(self.previous)
+
+
+def installed(new_hooks):
+    """Reports to new_hooks within a with block"""
+    return _Installed(new_hooks)
+
+
+def timed(current, operation, function, *args):
+    """Calls function(*args) and reports its duration to the current hooks"""
+    started = perf_counter()
+    try:
+        return function(*args)
+    finally:
+        current.observe(operation, perf_counter() - started)
+
+
+def failure_reason(actual_signature, expected_signature):
+    """Why actual_signature was rejected, expected_signature being valid"""
+    if not actual_signature:
+        return "missing"
+    if not isinstance(actual_signature, (str, bytes)) or len(actual_signature) != len(
+        expected_signature
+    ):
+        return "malformed"
+    return "mismatch"
+
+
+class Counters(Hooks):  # pylint: disable=too-many-instance-attributes
+    """
+    Hooks counting calls, latencies in histograms, cache hits and validation
+    failures in this process, to be read or exported to Prometheus.
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        from bisect import bisect_left
+        from collections import Counter
+
+        # bound once, as observe runs on every instrumented call
+        self._bisect = bisect_left
+        self.buckets = tuple(buckets)
+        self.calls = Counter()
+        self.seconds = Counter()
+        self.histograms = {}
+        self.cache_hits = Counter()
+        self.cache_misses = Counter()
+        self.validation_failures = Counter()
+
+    def observe(self, operation, seconds):
+        self.calls[operation] += 1
+        self.seconds[operation] += seconds
+
+        histogram = self.histograms.get(operation)
+        if histogram is None:
+            histogram = self.histograms[operation] = [0] * len(self.buckets)
+        histogram[self._bisect(self.buckets, seconds)] += 1
+
+    def cache(self, operation, hit):
+        if hit:
+            self.cache_hits[operation] += 1
+        else:
+            self.cache_misses[operation] += 1
+
+    def validation_failure(self, reason):
+        self.validation_failures[reason] += 1
+
+    def prometheus(self, prefix="libthumbor"):
+        """The counters in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {prefix}_seconds Duration of the libthumbor operations.",
+            f"# TYPE {prefix}_seconds histogram",
+        ]
+        for operation, histogram in sorted(self.histograms.items()):
+            count = 0
+            for bound, bucket in zip(self.buckets, histogram):
+                count += bucket
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f'{prefix}_seconds_bucket{{operation="{operation}",le="{le}"}} '
+                    f"{count}"
+                )
+            lines.append(
+                f'{prefix}_seconds_sum{{operation="{operation}"}} '
+                f"{self.seconds[operation]!r}"
+            )
+            lines.append(f'{prefix}_seconds_count{{operation="{operation}"}} {count}')
+
+        lines.append(f"# TYPE {prefix}_cache_lookups_total counter")
+        for result, counter in (("hit", self.cache_hits), ("miss", self.cache_misses)):
+            for operation, count in sorted(counter.items()):
+                lines.append(
+                    f"{prefix}_cache_lookups_total"
+                    f'{{operation="{operation}",result="{result}"}} {count}'
+                )
+
+        lines.append(f"# TYPE {prefix}_validation_failures_total counter")
+        for reason, count in sorted(self.validation_failures.items()):
+            lines.append(
+                f'{prefix}_validation_failures_total{{reason="{reason}"}} {count}'
+            )
+
+        return "\n".join(lines) + "\n"
+
+
+class StatsdHooks(Hooks):
+    """
+    Hooks sending timings and counts to a StatsD client, any object with
+    timing(name, milliseconds) and incr(name) methods such as the statsd
+    package's StatsClient.
+    """
+
+    def __init__(self, client, prefix="libthumbor"):
+        self.client = client
+        self.prefix = prefix
+
+    def observe(self, operation, seconds):
+        self.client.timing(f"{self.prefix}.{operation}", seconds * 1000)
+
+    def cache(self, operation, hit):
+        result = "hit" if hit else "miss"
+        self.client.incr(f"{self.prefix}.{operation}.cache_{result}")
+
+    def validation_failure(self, reason):
+        self.client.incr(f"{self.prefix}.validate.failure.{reason}")
@@ -10,47 +10,79 @@
 
 """URL composer to create options-based URLs for thumbor encryption."""
 
-# pylint: disable=line-too-long,too-many-branches,too-many-locals,too-many-arguments
+# pylint: disable=line-too-long,too-many-branches,too-many-locals,too-many-arguments,too-many-lines,import-outside-toplevel
 
 import hashlib
 import re
+from collections import namedtuple
 
-from six import b
+from libthumbor import instrumentation
+
+# libthumbor.filters is imported where used, so importing urls stays cheap
+_FILTERS_ATTRIBUTES = ("Filter", "FilterChain", "parse_filters", "split_filters")
 
 AVAILABLE_HALIGN = ["left", "center", "right"]
 AVAILABLE_VALIGN = ["top", "middle", "bottom"]
 
 
+def __getattr__(name):
+    # the libthumbor.filters names this module used to import
+    if name in _FILTERS_ATTRIBUTES:
+        from libthumbor import filters
+
+        return getattr(filters, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+UrlPart = namedtuple("UrlPart", ["name", "options", "arguments"])
+
+# Every segment of a thumbor URL, in the order thumbor expects them, with the
+# url_for options and the Url.generate_options arguments that compose it.
+# get_url_parts and Url.generate_options are written out by hand for speed, so
+# this declares the order they must follow, and the tests hold them to it.
+URL_PARTS = (
+    # debug is not an url_for option, only Url.generate_options knows it
+    UrlPart("debug", (), ("debug",)),
+    UrlPart("meta", ("meta",), ("meta",)),
+    UrlPart("trim", ("trim",), ("trim",)),
+    UrlPart("crop", ("crop",), ("crop_left", "crop_top", "crop_right", "crop_bottom")),
+    UrlPart(
+        "fit_in",
+        ("fit_in", "full_fit_in", "adaptive_fit_in", "adaptive_full_fit_in"),
+        ("fit_in", "adaptive", "full"),
+    ),
+    UrlPart(
+        "dimensions",
+        ("width", "height", "flip", "flop"),
+        ("width", "height", "horizontal_flip", "vertical_flip"),
+    ),
+    UrlPart("halign", ("halign",), ("halign",)),
+    UrlPart("valign", ("valign",), ("valign",)),
+    UrlPart("smart", ("smart",), ("smart",)),
+    UrlPart("filters", ("filters",), ("filters",)),
+)
+
+
 def calculate_width_and_height(url_parts, options):
     """Appends width and height information to url"""
-    width = options.get("width", 0)
-    has_width = width
-    height = options.get("height", 0)
-    has_height = height
+    _append_dimensions(
+        url_parts, options.get, options.get("width", 0), options.get("height", 0)
+    )
 
-    flip = options.get("flip", False)
-    flop = options.get("flop", False)
 
-    if flip:
-        width = width * -1
-    if flop:
-        height = height * -1
-
-    if not has_width and not has_height:
-        if flip:
-            width = "-0"
-        if flop:
-            height = "-0"
+def url_for(**options):
+    """Returns the url for the specified options"""
 
-    if width or height:
-        url_parts.append(f"{width}x{height}")
+    current = instrumentation.hooks
+    if current is not None:
+        return instrumentation.timed(current, "url_for", _url_for, options)
 
+    return _url_for(options)
 
-def url_for(**options):
-    """Returns the url for the specified options"""
 
+def _url_for(options):
     url_parts = get_url_parts(**options)
-    image_hash = hashlib.md5(b(options["image_url"])).hexdigest()
+    image_hash = hashlib.md5(options["image_url"].encode("latin-1")).hexdigest()
     url_parts.append(image_hash)
 
     return "/".join(url_parts)
@@ -69,95 +101,551 @@ def plain_image_url(**options):
 
 
 def get_url_parts(**options):
+    """The options segments of an url, in URL_PARTS order"""
     if "image_url" not in options:
         raise ValueError("The image_url argument is mandatory.")
+    if len(options) == 1:  # nothing but the image, so no segments
+        return []
 
     url_parts = []
+    get = options.get
 
-    if options.get("meta", False):
+    if get("meta"):
         url_parts.append("meta")
 
-    trim = options.get("trim", None)
+    trim = get("trim")
     if trim:
-        bits = ["trim"]
-        if not isinstance(trim, bool):
-            bits.append(trim[0] if trim[0] else "")
-            if trim[1]:
-                bits.append(str(trim[1]))
-        url_parts.append(":".join(bits))
-
-    crop = options.get("crop", None)
-    if crop:
-        crop_left = crop[0][0]
-        crop_top = crop[0][1]
-        crop_right = crop[1][0]
-        crop_bottom = crop[1][1]
-
-        if crop_left > 0 or crop_top > 0 or crop_bottom > 0 or crop_right > 0:
-            url_parts.append(f"{crop_left}x{crop_top}:{crop_right}x{crop_bottom}")
+        if isinstance(trim, bool):
+            url_parts.append("trim")
+        elif trim[1]:
+            url_parts.append(f"trim:{trim[0] or ''}:{trim[1]}")
+        else:
+            url_parts.append(f"trim:{trim[0] or ''}")
 
-    calculate_fit_in(options, url_parts)
-    calculate_width_and_height(url_parts, options)
+    crop = get("crop")
+    if crop:
+        left = crop[0][0]
+        top = crop[0][1]
+        right = crop[1][0]
+        bottom = crop[1][1]
 
-    halign = options.get("halign", "center")
-    valign = options.get("valign", "middle")
+        if left > 0 or top > 0 or bottom > 0 or right > 0:
+            url_parts.append(f"{left}x{top}:{right}x{bottom}")
 
-    if halign not in AVAILABLE_HALIGN:
-        raise ValueError(
-            'Only "left", "center" and "right" are'
-            + " valid values for horizontal alignment."
-        )
-    if valign not in AVAILABLE_VALIGN:
-        raise ValueError(
-            'Only "top", "middle" and "bottom" are'
-            + " valid values for vertical alignment."
-        )
+    width = get("width", 0)
+    height = get("height", 0)
+    _append_fit_in(url_parts, get, width or height)
+    _append_dimensions(url_parts, get, width, height)
 
+    halign = get("halign", "center")
     if halign != "center":
+        if halign not in AVAILABLE_HALIGN:
+            raise ValueError(
+                'Only "left", "center" and "right" are'
+                + " valid values for horizontal alignment."
+            )
         url_parts.append(halign)
+
+    valign = get("valign", "middle")
     if valign != "middle":
+        if valign not in AVAILABLE_VALIGN:
+            raise ValueError(
+                'Only "top", "middle" and "bottom" are'
+                + " valid values for vertical alignment."
+            )
         url_parts.append(valign)
 
-    if options.get("smart", False):
+    if get("smart"):
         url_parts.append("smart")
 
-    if options.get("filters", False):
-        filters_string = ["filters"]
-        for filter_value in options["filters"]:
-            filters_string.append(filter_value)
-        url_parts.append(":".join(filters_string))
+    filters = get("filters")
+    if filters:
+        if isinstance(filters, str):  # a Filter, or filters already in url form
+            url_parts.append(f"filters:{filters}")
+        else:
+            url_parts.append(":".join(["filters", *filters]))
 
     return url_parts
 
 
-def calculate_fit_in(options, url_parts):
-    fit_in = False
-    full_fit_in = False
-
-    if options.get("fit_in", None):
-        fit_in = True
+def _append_fit_in(url_parts, get, has_size):
+    """Appends the fit-in segments, reading options with get"""
+    fit_in = get("fit_in")
+    if fit_in:
         url_parts.append("fit-in")
-
-    if options.get("full_fit_in", None):
-        full_fit_in = True
+    full_fit_in = get("full_fit_in")
+    if full_fit_in:
         url_parts.append("full-fit-in")
-
-    if options.get("adaptive_fit_in", None):
+    if get("adaptive_fit_in"):
         fit_in = True
         url_parts.append("adaptive-fit-in")
-
-    if options.get("adaptive_full_fit_in", None):
+    if get("adaptive_full_fit_in"):
         full_fit_in = True
         url_parts.append("adaptive-full-fit-in")
-
-    if (fit_in or full_fit_in) and not (
-        options.get("width", None) or options.get("height", None)
-    ):
+    if (fit_in or full_fit_in) and not has_size:
         raise ValueError(
             "When using fit-in or full-fit-in, you must specify width and/or height."
         )
 
 
+def _append_dimensions(url_parts, get, width, height):
+    """Appends the dimensions segment, flipped as the flip and flop options say"""
+    flip = get("flip")
+    flop = get("flop")
+    if flip or flop:
+        has_size = width or height
+        if flip:
+            width = width * -1 if has_size else "-0"
+        if flop:
+            height = height * -1 if has_size else "-0"
+    if width or height:
+        url_parts.append(f"{width}x{height}")
+
+
+def calculate_fit_in(options, url_parts):
+    """Appends the fit-in segments of the options to url"""
+    _append_fit_in(
+        url_parts, options.get, options.get("width") or options.get("height")
+    )
+
+
+def _is_trim_segment(segment):
+    """Whether segment is trim[:top-left|:bottom-right][:tolerance]"""
+    if segment[:4] != "trim":
+        return False
+
+    rest = segment[4:]
+    for orientation in (":top-left", ":bottom-right"):
+        if rest.startswith(orientation):
+            rest = rest[len(orientation) :]
+            break
+
+    return not rest or (rest[0] == ":" and rest[1:].isdecimal())
+
+
+# (adaptive, full) of each fit-in segment
+_FIT_IN_SEGMENTS = {
+    "fit-in": (False, False),
+    "adaptive-fit-in": (True, False),
+    "full-fit-in": (False, True),
+    "adaptive-full-fit-in": (True, True),
+}
+
+
+def _parse_crop(segment):
+    """(left, top, right, bottom) of a crop segment, or None if it isn't one"""
+    first, colon, second = segment.partition(":")
+    left, first_x, top = first.partition("x")
+    right, second_x, bottom = second.partition("x")
+
+    if (
+        colon
+        and first_x
+        and second_x
+        and left.isdecimal()
+        and top.isdecimal()
+        and right.isdecimal()
+        and bottom.isdecimal()
+    ):
+        return int(left), int(top), int(right), int(bottom)
+
+    return None
+
+
+def _parse_side(value):
+    """(flip, size) of one side of a dimensions segment, or None"""
+    flip = value.startswith("-")
+    if flip:
+        value = value[1:]
+
+    if not value:
+        return flip, 0
+    if value == "orig":
+        return flip, value
+    if value.isdecimal():
+        return flip, int(value)
+
+    return None
+
+
+def _parse_dimensions(segment):
+    """(horizontal_flip, width, vertical_flip, height) of a segment, or None"""
+    width, x, height = segment.partition("x")
+    if not x:
+        return None
+
+    width = _parse_side(width)
+    height = _parse_side(height)
+    if width is None or height is None:
+        return None
+
+    return width[0], width[1], height[0], height[1]
+
+
+def _values_dict(
+    debug,
+    meta,
+    trim,
+    crop_left,
+    crop_top,
+    crop_right,
+    crop_bottom,
+    adaptive,
+    full,
+    fit_in,
+    width,
+    height,
+    horizontal_flip,
+    vertical_flip,
+    halign,
+    valign,
+    smart,
+    filters,
+    image,
+):  # pylint: disable=too-many-positional-arguments
+    return {
+        "debug": debug,
+        "meta": meta,
+        "trim": trim,
+        "crop": {
+            "left": crop_left,
+            "top": crop_top,
+            "right": crop_right,
+            "bottom": crop_bottom,
+        },
+        "adaptive": adaptive,
+        "full": full,
+        "fit_in": fit_in,
+        "width": width,
+        "height": height,
+        "horizontal_flip": horizontal_flip,
+        "vertical_flip": vertical_flip,
+        "halign": halign,
+        "valign": valign,
+        "smart": smart,
+        "filters": filters,
+        "image": image,
+    }
+
+
+def _parse_segments(url, factory=_values_dict):
+    """
+    Parses an url without signature one "/" separated segment at a time,
+    with the same results as Url.regex(has_unsafe_or_hash=False). The parsed
+    values are given positionally to factory, which builds the result.
+
+    Returns None when only the regex can decide: for urls spanning several
+    lines, or when the options leave no image, which makes the regex
+    backtrack.
+    """
+    if "\n" in url:
+        return None
+
+    debug = meta = fit_in = adaptive = full = smart = False
+    horizontal_flip = vertical_flip = False
+    trim = None
+    crop_left = crop_top = crop_right = crop_bottom = width = height = 0
+    halign = "center"
+    valign = "middle"
+    filters = ""
+
+    start = 1 if url.startswith("/") else 0
+    end = url.find("/", start)
+    segment = url[start:end] if end != -1 else None
+
+    if segment == "debug":
+        debug = True
+        start = end + 1
+        end = url.find("/", start)
+        segment = url[start:end] if end != -1 else None
+
+    if segment == "meta":
+        meta = True
+        start = end + 1
+        end = url.find("/", start)
+        segment = url[start:end] if end != -1 else None
+
+    if segment is not None and _is_trim_segment(segment):
+        trim = segment
+        start = end + 1
+        end = url.find("/", start)
+        segment = url[start:end] if end != -1 else None
+
+    crop = _parse_crop(segment) if segment is not None else None
+    if crop is not None:
+        crop_left, crop_top, crop_right, crop_bottom = crop
+        start = end + 1
+        end = url.find("/", start)
+        segment = url[start:end] if end != -1 else None
+
+    fit = _FIT_IN_SEGMENTS.get(segment)
+    if fit is not None:
+        adaptive, full = fit
+        fit_in = True
+        start = end + 1
+        end = url.find("/", start)
+        segment = url[start:end] if end != -1 else None
+
+    dimensions = _parse_dimensions(segment) if segment is not None else None
+    if dimensions is not None:
+        horizontal_flip, width, vertical_flip, height = dimensions
+        start = end + 1
+        end = url.find("/", start)
+        segment = url[start:end] if end != -1 else None
+
+    if segment in ("left", "right", "center"):
+        halign = segment
+        start = end + 1
+        end = url.find("/", start)
+        segment = url[start:end] if end != -1 else None
+
+    if segment in ("top", "bottom", "middle"):
+        valign = segment
+        start = end + 1
+        end = url.find("/", start)
+        segment = url[start:end] if end != -1 else None
+
+    if segment == "smart":
+        smart = True
+        start = end + 1
+
+    if url.startswith("filters:", start):
+        # like the lazy "filters:(.+?\))/", up to the first ")/" that leaves
+        # at least one character for the filters
+        closing = url.find(")/", start + len("filters:") + 1)
+        if closing != -1:
+            filters = url[start + len("filters:") : closing + 1]
+            start = closing + 2
+
+    image = url[start:]
+    if not image:
+        return None
+
+    return factory(
+        debug,
+        meta,
+        trim,
+        crop_left,
+        crop_top,
+        crop_right,
+        crop_bottom,
+        adaptive,
+        full,
+        fit_in,
+        width,
+        height,
+        horizontal_flip,
+        vertical_flip,
+        halign,
+        valign,
+        smart,
+        filters,
+        image,
+    )
+
+
+class ParsedUrl:  # pylint: disable=too-many-instance-attributes
+    """
+    Values of a parsed thumbor url, as attributes instead of a dict. The
+    attributes are named after the Url.generate_options arguments, so the
+    url can be serialized back with generate_options().
+
+    unsafe and hash are only set by Url.parse().
+    """
+
+    __slots__ = (
+        "debug",
+        "meta",
+        "trim",
+        "crop_left",
+        "crop_top",
+        "crop_right",
+        "crop_bottom",
+        "adaptive",
+        "full",
+        "fit_in",
+        "width",
+        "height",
+        "horizontal_flip",
+        "vertical_flip",
+        "halign",
+        "valign",
+        "smart",
+        "filters",
+        "image",
+        "unsafe",
+        "hash",
+        "_filter_list",
+    )
+
+    def __init__(
+        self,
+        debug=False,
+        meta=False,
+        trim=None,
+        crop_left=0,
+        crop_top=0,
+        crop_right=0,
+        crop_bottom=0,
+        adaptive=False,
+        full=False,
+        fit_in=False,
+        width=0,
+        height=0,
+        horizontal_flip=False,
+        vertical_flip=False,
+        halign="center",
+        valign="middle",
+        smart=False,
+        filters="",
+        image=None,
+    ):  # pylint: disable=too-many-positional-arguments,too-many-locals
+        self.debug = debug
+        self.meta = meta
+        self.trim = trim
+        self.crop_left = crop_left
+        self.crop_top = crop_top
+        self.crop_right = crop_right
+        self.crop_bottom = crop_bottom
+        self.adaptive = adaptive
+        self.full = full
+        self.fit_in = fit_in
+        self.width = width
+        self.height = height
+        self.horizontal_flip = horizontal_flip
+        self.vertical_flip = vertical_flip
+        self.halign = halign
+        self.valign = valign
+        self.smart = smart
+        self.filters = filters
+        self.image = image
+        self.unsafe = False
+        self.hash = None
+        self._filter_list = None
+
+    @classmethod
+    def from_dict(cls, values):
+        """Builds a ParsedUrl from a Url.parse_decrypted() dict"""
+        crop = values["crop"]
+        return cls(
+            values["debug"],
+            values["meta"],
+            values["trim"],
+            crop["left"],
+            crop["top"],
+            crop["right"],
+            crop["bottom"],
+            values["adaptive"],
+            values["full"],
+            values["fit_in"],
+            values["width"],
+            values["height"],
+            values["horizontal_flip"],
+            values["vertical_flip"],
+            values["halign"],
+            values["valign"],
+            values["smart"],
+            values["filters"],
+            values["image"],
+        )
+
+    @property
+    def crop(self):
+        return {
+            "left": self.crop_left,
+            "top": self.crop_top,
+            "right": self.crop_right,
+            "bottom": self.crop_bottom,
+        }
+
+    @property
+    def filter_list(self):
+        """The filters split one per item, only done when first accessed"""
+        if self._filter_list is None:
+            from libthumbor.filters import split_filters
+
+            self._filter_list = split_filters(self.filters)
+        return self._filter_list
+
+    @property
+    def filter_chain(self):
+        """The filters as a FilterChain, validated and cached by parse_filters"""
+        from libthumbor.filters import parse_filters
+
+        return parse_filters(self.filters)
+
+    def get(self, name, default=None):
+        """Value of a Url.generate_options argument"""
+        if name == "trim":
+            # generate_options() takes trim without its "trim:" prefix
+            if not self.trim:
+                return None
+            return self.trim[len("trim:") :] or True
+
+        return getattr(self, name, default)
+
+    def generate_options(self):
+        """Serializes the options back, as Url.generate_options() would"""
+        return Url.generate_options(
+            debug=self.debug,
+            width=self.width,
+            height=self.height,
+            smart=self.smart,
+            meta=self.meta,
+            trim=self.get("trim"),
+            adaptive=self.adaptive,
+            full=self.full,
+            fit_in=self.fit_in,
+            horizontal_flip=self.horizontal_flip,
+            vertical_flip=self.vertical_flip,
+            halign=self.halign,
+            valign=self.valign,
+            crop_left=self.crop_left,
+            crop_top=self.crop_top,
+            crop_right=self.crop_right,
+            crop_bottom=self.crop_bottom,
+            filters=self.filters,
+        )
+
+    def as_dict(self):
+        """The same dict Url.parse_decrypted() returns"""
+        return _values_dict(
+            self.debug,
+            self.meta,
+            self.trim,
+            self.crop_left,
+            self.crop_top,
+            self.crop_right,
+            self.crop_bottom,
+            self.adaptive,
+            self.full,
+            self.fit_in,
+            self.width,
+            self.height,
+            self.horizontal_flip,
+            self.vertical_flip,
+            self.halign,
+            self.valign,
+            self.smart,
+            self.filters,
+            self.image,
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, ParsedUrl):
+            return NotImplemented
+        return (
+            self.as_dict() == other.as_dict()
+            and self.unsafe == other.unsafe
+            and self.hash == other.hash
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ParsedUrl({self.generate_options()!r}, image={self.image!r})"
+
+
 class Url:
 
     unsafe_or_hash = r"(?:(?:(?P<unsafe>unsafe)|(?P<hash>.+?))/)?"
@@ -174,6 +662,7 @@ class Url:
     image = r"(?P<image>.+)"
 
     compiled_regex = None
+    compiled_regex_with_hash = None
 
     @classmethod
     def regex(cls, has_unsafe_or_hash=True):
@@ -196,13 +685,103 @@ class Url:
         return "".join(reg)
 
     @classmethod
-    def parse_decrypted(cls, url):
-        if cls.compiled_regex:
-            reg = cls.compiled_regex
+    def compiled(cls, has_unsafe_or_hash=True):
+        """Url.regex(), compiled once per class"""
+        if has_unsafe_or_hash:
+            if cls.compiled_regex_with_hash is None:
+                cls.compiled_regex_with_hash = re.compile(cls.regex(True))
+            return cls.compiled_regex_with_hash
+
+        if cls.compiled_regex is None:
+            cls.compiled_regex = re.compile(cls.regex(False))
+        return cls.compiled_regex
+
+    @classmethod
+    def parse(cls, url, signer=None, allow_unsafe=False, as_object=False):
+        """
+        Parses a full thumbor url, signature included, in one pass.
+
+        When a signer is given, the signature is validated against the rest
+        of the url and unsafe urls are refused unless allow_unsafe is set.
+        Returns the values of parse_decrypted() plus "unsafe" and "hash", as
+        a ParsedUrl if as_object is set, or None if the url doesn't parse or
+        its signature doesn't match.
+        """
+        validate = signer.validate if signer is not None else None
+        return cls._parse(url, validate, allow_unsafe, as_object)
+
+    @classmethod
+    def iter_parse(cls, urls, signer=None, allow_unsafe=False, as_object=False):
+        """
+        Lazily parses each url of urls as parse() does, yielding None for the
+        ones that don't parse or validate. Trailing line breaks are ignored,
+        so the lines of a file can be given as they are.
+        """
+        parse = cls._parse
+        validate = signer.validate if signer is not None else None
+
+        for url in urls:
+            yield parse(url.rstrip("\r\n"), validate, allow_unsafe, as_object)
+
+    @classmethod
+    def _parse(cls, url, validate, allow_unsafe, as_object):
+        start = 1 if url.startswith("/") else 0
+        end = url.find("/", start)
+        if end <= start:
+            return None
+
+        signature = url[start:end]
+        decrypted = url[end + 1 :]
+        unsafe = signature == "unsafe"
+
+        if validate is not None:
+            if unsafe:
+                if not allow_unsafe:
+                    return None
+            elif not validate(signature, decrypted):
+                return None
+
+        values = cls.parse_decrypted(decrypted, as_object=as_object)
+        if values is None:
+            return None
+
+        if as_object:
+            values.unsafe = unsafe
+            values.hash = None if unsafe else signature
         else:
-            reg = cls.compiled_regex = re.compile(cls.regex(has_unsafe_or_hash=False))
+            values["unsafe"] = unsafe
+            values["hash"] = None if unsafe else signature
+        return values
+
+    @classmethod
+    def parse_decrypted(cls, url, as_object=False):
+        """
+        Parses an url without its signature into a dict, or into a ParsedUrl
+        if as_object is set. Returns None if it doesn't parse.
+        """
+        current = instrumentation.hooks
+        if current is not None:
+            return instrumentation.timed(
+                current, "parse_decrypted", cls._parse_decrypted, url, as_object
+            )
+
+        return cls._parse_decrypted(url, as_object)
+
+    @classmethod
+    def _parse_decrypted(cls, url, as_object):
+        values = _parse_segments(url, ParsedUrl if as_object else _values_dict)
+        if values is not None:
+            return values
+
+        values = cls.parse_decrypted_with_regex(url)
+        if as_object and values is not None:
+            return ParsedUrl.from_dict(values)
+
+        return values
 
-        result = reg.match(url)
+    @classmethod
+    def parse_decrypted_with_regex(cls, url):
+        result = cls.compiled(has_unsafe_or_hash=False).match(url)
 
         if not result:
             return None
@@ -265,6 +844,7 @@ class Url:
         crop_bottom=None,
         filters=None,
     ):
+        """The options part of a thumbor URL, its segments in URL_PARTS order"""
         url = []
 
         if debug:
@@ -279,18 +859,14 @@ class Url:
             else:
                 url.append(f"trim:{trim}")
 
-        crop = crop_left or crop_top or crop_right or crop_bottom
-        if crop:
+        if crop_left or crop_top or crop_right or crop_bottom:
             url.append(f"{crop_left}x{crop_top}:{crop_right}x{crop_bottom}")
 
         if fit_in:
-            fit_ops = []
             if adaptive:
-                fit_ops.append("adaptive")
-            if full:
-                fit_ops.append("full")
-            fit_ops.append("fit-in")
-            url.append("-".join(fit_ops))
+                url.append("adaptive-full-fit-in" if full else "adaptive-fit-in")
+            else:
+                url.append("full-fit-in" if full else "fit-in")
 
         if horizontal_flip:
             width = f"-{width}"
@@ -8,18 +8,146 @@
 # http://www.opensource.org/licenses/mit-license
 # Copyright (c) 2011 globo.com timehome@corp.globo.com
 
-from six import text_type
+import base64
+import hmac
+from functools import lru_cache
+
+from libthumbor import instrumentation
+
+DEFAULT_URL_SIGNER = "libthumbor.url_signers.base64_hmac_sha1"
+
+
+def _to_bytes(value):
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    return value
+
+
+def load(module_name=DEFAULT_URL_SIGNER):
+    """
+    Returns the UrlSigner class of a signer module, the same way thumbor
+    loads its URL_SIGNER setting.
+    """
+    module = __import__(module_name, fromlist=["UrlSigner"])
+    return module.UrlSigner
 
 
 class BaseUrlSigner:
     def __init__(self, security_key):
-        if isinstance(security_key, text_type):
+        if isinstance(security_key, str):
             security_key = security_key.encode("utf-8")
         self.security_key = security_key
 
     def validate(self, actual_signature, url):
+        """
+        Checks actual_signature against the signature of url in constant
+        time. The signature may be given either as str or as bytes.
+        """
+        current = instrumentation.hooks
+        if current is None:
+            return self._validate(actual_signature, url)
+
+        valid = instrumentation.timed(
+            current, "validate", self._validate, actual_signature, url
+        )
+        if not valid:
+            current.validation_failure(
+                instrumentation.failure_reason(actual_signature, self.signature(url))
+            )
+        return valid
+
+    def _validate(self, actual_signature, url):
         url_signature = self.signature(url)
-        return url_signature == actual_signature
+
+        if isinstance(url_signature, str) and isinstance(actual_signature, str):
+            try:
+                return hmac.compare_digest(url_signature, actual_signature)
+            except TypeError:
+                pass  # only ASCII str are compared directly
+
+        try:
+            return hmac.compare_digest(
+                _to_bytes(url_signature), _to_bytes(actual_signature)
+            )
+        except TypeError:
+            return False  # e.g. no signature at all
 
     def signature(self, url):
         raise NotImplementedError()
+
+    def signatures(self, urls):
+        """Signatures of every url, in the same order"""
+        return [self.signature(url) for url in urls]
+
+
+class HashUrlSigner(BaseUrlSigner):
+    """
+    Base for signers that sign with the base64 digest of a keyed hash object
+    (hmac or keyed blake2). The keyed object is built once by keyed_hasher()
+    and copied for every signature.
+    """
+
+    def __init__(self, security_key):
+        super().__init__(security_key)
+        self._hasher = self.keyed_hasher(self.security_key)
+
+    def keyed_hasher(self, security_key):
+        """
+        Hash object already keyed with security_key, to be copied before use.
+        Implementations share it between every signer of the same key, so
+        creating a signer per request doesn't redo the key schedule.
+        """
+        raise NotImplementedError()
+
+    def signature(self, url):
+        hasher = self._hasher.copy()
+        hasher.update(str(url).encode("utf-8"))
+        return base64.urlsafe_b64encode(hasher.digest())
+
+    def signatures(self, urls):
+        hasher_copy = self._hasher.copy
+        b64encode = base64.urlsafe_b64encode
+        signatures = []
+
+        for url in urls:
+            hasher = hasher_copy()
+            hasher.update(str(url).encode("utf-8"))
+            signatures.append(b64encode(hasher.digest()))
+
+        return signatures
+
+
+@lru_cache(maxsize=16)
+def keyed_blake2(blake2, security_key, digest_size):
+    """blake2, hashlib.blake2b or blake2s, keyed with security_key"""
+    name = blake2.__name__.replace("blake", "BLAKE")
+
+    if len(security_key) > blake2.MAX_KEY_SIZE:
+        raise ValueError(
+            f"{name} security keys are limited to {blake2.MAX_KEY_SIZE} bytes."
+        )
+    if not 1 <= digest_size <= blake2.MAX_DIGEST_SIZE:
+        raise ValueError(
+            f"{name} digests are between 1 and {blake2.MAX_DIGEST_SIZE} bytes."
+        )
+
+    return blake2(key=security_key, digest_size=digest_size)
+
+
+class Blake2UrlSigner(HashUrlSigner):
+    """
+    Base for signers using keyed BLAKE2, the blake2 attribute being the
+    hashlib constructor. Digests are truncated to digest_size bytes, from 1 to
+    the constructor's MAX_DIGEST_SIZE.
+    """
+
+    blake2 = None
+    digest_size = 16
+
+    def __init__(self, security_key, digest_size=None):
+        if digest_size is not None:
+            self.digest_size = digest_size
+        super().__init__(security_key)
+
+    def keyed_hasher(self, security_key):
+        return keyed_blake2(self.blake2, security_key, self.digest_size)
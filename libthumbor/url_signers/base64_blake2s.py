@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+
+from libthumbor.url_signers import Blake2UrlSigner
+
+
+class UrlSigner(Blake2UrlSigner):
+    """
+    Validate urls and sign them using base64 keyed blake2s. Digests are
+    truncated to digest_size bytes, 16 by default and at most 32.
+    """
+
+    blake2 = hashlib.blake2s
@@ -1,20 +1,25 @@
 # -*- coding: utf-8 -*-
 
-import base64
 import hashlib
 import hmac
+from functools import lru_cache
 
-from six import text_type
+from libthumbor.url_signers import HashUrlSigner
 
-from libthumbor.url_signers import BaseUrlSigner
 
+@lru_cache(maxsize=16)
+def keyed_hmac(security_key):
+    """HMAC-SHA1 keyed with security_key"""
+    return hmac.new(security_key, digestmod=hashlib.sha1)
 
-class UrlSigner(BaseUrlSigner):
+
+class UrlSigner(HashUrlSigner):
     """Validate urls and sign them using base64 hmac-sha1"""
 
-    def signature(self, url):
-        return base64.urlsafe_b64encode(
-            hmac.new(
-                self.security_key, text_type(url).encode("utf-8"), hashlib.sha1
-            ).digest()
-        )
+    def keyed_hasher(self, security_key):
+        return keyed_hmac(security_key)
+
+    @property
+    def hmac(self):
+        """Copy of the keyed hmac, which is shared by every signer of the key"""
+        return self._hasher.copy()
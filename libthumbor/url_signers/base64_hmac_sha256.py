@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import hmac
+from functools import lru_cache
+
+from libthumbor.url_signers import HashUrlSigner
+
+
+@lru_cache(maxsize=16)
+def keyed_hmac(security_key):
+    """HMAC-SHA256 keyed with security_key"""
+    return hmac.new(security_key, digestmod=hashlib.sha256)
+
+
+class UrlSigner(HashUrlSigner):
+    """Validate urls and sign them using base64 hmac-sha256"""
+
+    def keyed_hasher(self, security_key):
+        return keyed_hmac(security_key)
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+from libthumbor.url_signers import BaseUrlSigner
+from libthumbor.url_signers import load as load_signer
+from libthumbor.url_signers.base64_hmac_sha1 import UrlSigner
+
+
+class MultiKeyUrlSigner(BaseUrlSigner):
+    """
+    Signs urls with the first (current) of several security keys and
+    validates them against any of them, to rotate keys without breaking the
+    urls signed with the previous ones.
+
+    Keys are tried most matched first, and matches are counted per key in
+    the matches list, in the order the keys were given.
+    """
+
+    def __init__(self, security_keys, signer=UrlSigner):
+        if isinstance(security_keys, (str, bytes)):
+            security_keys = [security_keys]
+        if not security_keys:
+            raise ValueError("At least one security key is required.")
+        if isinstance(signer, str):
+            signer = load_signer(signer)
+
+        self.signers = [signer(security_key) for security_key in security_keys]
+        super().__init__(self.signers[0].security_key)
+
+        self.matches = [0] * len(self.signers)
+        self.failures = 0
+        self._order = list(range(len(self.signers)))
+
+    def signature(self, url):
+        return self.signers[0].signature(url)
+
+    def signatures(self, urls):
+        return self.signers[0].signatures(urls)
+
+    def match(self, actual_signature, url):
+        """
+        Returns the index of the key that signed url with actual_signature,
+        or None if none of them did.
+        """
+        for position, index in enumerate(self._order):
+            # pylint: disable=protected-access
+            if self.signers[index]._validate(actual_signature, url):
+                self.matches[index] += 1
+                self._promote(position)
+                return index
+
+        self.failures += 1
+        return None
+
+    def _validate(self, actual_signature, url):
+        return self.match(actual_signature, url) is not None
+
+    def _promote(self, position):
+        # moves a key one step ahead once it has matched more often than the
+        # key before it, so the likeliest key ends up tried first
+        if position == 0:
+            return
+
+        order = self._order
+        if self.matches[order[position]] > self.matches[order[position - 1]]:
+            order[position - 1], order[position] = order[position], order[position - 1]
@@ -0,0 +1,132 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""libthumbor asyncio signing tests"""
+
+import multiprocessing
+import pickle
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from preggy import expect
+
+from libthumbor.aio import AsyncCryptoURL
+from libthumbor.crypto import CryptoURL
+from libthumbor.url_signers import base64_blake2b
+
+KEY = "my-security-key"
+
+
+def options(count):
+    return [
+        {"image_url": f"my.server.com/{index}.jpg", "width": 300, "height": 200}
+        for index in range(count)
+    ]
+
+
+class SyncExecutor(Executor):
+    """Runs jobs right away, counting them"""
+
+    def __init__(self):
+        self.jobs = 0
+
+    def submit(self, fn, /, *args, **kwargs):  # pylint: disable=arguments-differ
+        self.jobs += 1
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+class AsyncCryptoURLTestCase(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.crypto = CryptoURL(KEY)
+        self.executor = SyncExecutor()
+        self.aio = AsyncCryptoURL(
+            self.crypto, executor=self.executor, inline_limit=4, chunk_size=8
+        )
+
+    async def test_generate(self):
+        url = await self.aio.generate(image_url="my.server.com/a.jpg", width=300)
+
+        expect(url).to_equal(
+            self.crypto.generate(image_url="my.server.com/a.jpg", width=300)
+        )
+
+    async def test_small_batches_are_signed_inline(self):
+        urls = await self.aio.generate_many(options(4))
+
+        expect(urls).to_equal(self.crypto.generate_many(options(4)))
+        expect(self.executor.jobs).to_equal(0)
+
+    async def test_large_batches_are_chunked_on_the_executor(self):
+        urls = await self.aio.generate_many(options(20))
+
+        expect(urls).to_equal(self.crypto.generate_many(options(20)))
+        expect(self.executor.jobs).to_equal(3)
+
+    async def test_batches_within_inline_limit_larger_than_chunks_are_inline(self):
+        aio = AsyncCryptoURL(
+            self.crypto, executor=self.executor, inline_limit=500, chunk_size=256
+        )
+
+        urls = await aio.generate_many(options(300))
+
+        expect(urls).to_equal(self.crypto.generate_many(options(300)))
+        expect(self.executor.jobs).to_equal(0)
+
+        urls = await aio.generate_many(options(501))
+
+        expect(urls).to_equal(self.crypto.generate_many(options(501)))
+        expect(self.executor.jobs).to_equal(2)
+
+    async def test_can_iterate_an_async_iterable(self):
+        async def items():
+            for item in options(10):
+                yield item
+
+        urls = [url async for url in self.aio.iter_generate(items())]
+
+        expect(urls).to_equal(self.crypto.generate_many(options(10)))
+        expect(self.executor.jobs).to_equal(2)
+
+    async def test_empty_batch(self):
+        expect(await self.aio.generate_many([])).to_equal([])
+
+    async def test_uses_the_default_executor(self):
+        aio = AsyncCryptoURL(KEY, inline_limit=0, chunk_size=3, cache_size=10)
+
+        urls = await aio.generate_many(options(10))
+
+        expect(urls).to_equal(self.crypto.generate_many(options(10)))
+        expect(aio.crypto.cache_info().misses).to_equal(10)
+
+    async def test_can_sign_on_a_process_pool(self):
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(1, mp_context=context) as executor:
+            aio = AsyncCryptoURL(KEY, executor=executor, inline_limit=0, chunk_size=5)
+            urls = await aio.generate_many(options(10))
+
+        expect(urls).to_equal(self.crypto.generate_many(options(10)))
+
+
+class PicklingTestCase(TestCase):
+    def test_crypto_url_can_be_pickled(self):
+        crypto = CryptoURL(
+            KEY, cache_size=10, cache_ttl=5, signer=base64_blake2b.UrlSigner
+        )
+
+        copy = pickle.loads(pickle.dumps(crypto))
+
+        expect(copy.signer).to_be_instance_of(base64_blake2b.UrlSigner)
+        expect(copy.cache.maxsize).to_equal(10)
+        expect(copy.cache.ttl).to_equal(5)
+        expect(copy.generate(image_url="a.jpg")).to_equal(
+            crypto.generate(image_url="a.jpg")
+        )
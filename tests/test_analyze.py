@@ -0,0 +1,115 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""libthumbor access log analyzer tests"""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase, mock
+
+from preggy import expect
+
+from libthumbor.analyze import analyze, chunk_offsets, iter_request_paths, main
+from libthumbor.crypto import CryptoURL
+
+CRYPTO = CryptoURL("my-security-key")
+
+LOG = "".join(
+    [
+        '10.0.0.1 - - [18/Oct/2026:10:00:00 +0000] "GET '
+        + CRYPTO.generate(image_url="a.com/1.jpg", width=300, height=200, smart=True)
+        + '?v=2 HTTP/1.1" 200 1234 "-" "curl/8.0"\n',
+        "2026-10-18 10:00:00 tornado.access:INFO 200 GET "
+        + CRYPTO.generate(
+            image_url="a.com/2.jpg",
+            fit_in=True,
+            width=300,
+            height=200,
+            filters=["quality(80)", "format(webp)"],
+        )
+        + " (10.0.0.1) 12.34ms\n",
+        '10.0.0.1 - - [18/Oct/2026:10:00:01 +0000] "HEAD '
+        "/unsafe/adaptive-fit-in/-300x200/filters:quality(80)/a.com/3%20b.jpg"
+        ' HTTP/1.1" 200 0 "-" "curl/8.0"\n',
+        '10.0.0.1 - - [18/Oct/2026:10:00:02 +0000] "GET /healthcheck HTTP/1.1" 200\n',
+        '10.0.0.1 - - [18/Oct/2026:10:00:03 +0000] "POST /upload HTTP/1.1" 201\n',
+    ]
+)
+
+
+class AnalyzeTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, "access.log")
+        with open(self.path, "w", encoding="utf-8") as stream:
+            stream.write(LOG * 3)
+
+    def test_finds_request_paths(self):
+        paths = list(iter_request_paths(LOG.encode()))
+
+        expect(paths).to_length(4)
+        expect(paths[0]).to_match(r"^/[^/]+/300x200/smart/a\.com/1\.jpg$")
+        expect(paths[3]).to_equal("/healthcheck")
+
+    def test_cuts_chunks_at_line_ends(self):
+        buffer = b"first\nsecond line\nthird"
+
+        expect(chunk_offsets(buffer, 4)).to_equal([(0, 6), (6, 18), (18, 23)])
+        expect(chunk_offsets(buffer, 100)).to_equal([(0, 23)])
+
+    def test_counts_transformations(self):
+        stats = analyze(self.path, workers=1)
+
+        expect(stats.requests).to_equal(12)
+        expect(stats.unparsed).to_equal(3)
+        expect(dict(stats.presets)).to_equal(
+            {
+                "300x200/smart": 3,
+                "fit-in/300x200/filters:quality(80):format(webp)": 3,
+                "adaptive-fit-in/-300x200/filters:quality(80)": 3,
+            }
+        )
+        expect(dict(stats.dimensions)).to_equal({"300x200": 6, "-300x200": 3})
+        expect(dict(stats.fit_in)).to_equal(
+            {"none": 3, "fit-in": 3, "adaptive-fit-in": 3}
+        )
+        expect(dict(stats.filters)).to_equal({"quality": 6, "format": 3})
+        expect(dict(stats.smart)).to_equal({True: 3, False: 6})
+
+    def test_parallel_chunks_count_the_same(self):
+        expected = analyze(self.path, workers=1).as_dict()
+
+        stats = analyze(self.path, workers=2, chunk_size=100)
+
+        expect(stats.as_dict()).to_equal(expected)
+
+    def test_prints_json(self):
+        stdout = io.StringIO()
+
+        with mock.patch("sys.stdout", stdout):
+            status = main([self.path, "--json", "-w", "1", "-n", "1"])
+
+        expect(status).to_equal(0)
+        result = json.loads(stdout.getvalue())
+        expect(result["requests"]).to_equal(12)
+        expect(result["filters"]).to_equal([["quality", 6]])
+
+    def test_prints_report(self):
+        stdout = io.StringIO()
+
+        with mock.patch("sys.stdout", stdout):
+            main([self.path, "-w", "1"])
+
+        expect(stdout.getvalue()).to_include("requests            12\n")
+        expect(stdout.getvalue()).to_include("           3   33.3%  300x200/smart\n")
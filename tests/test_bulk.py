@@ -0,0 +1,183 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""libthumbor bulk signing tests"""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase, mock
+
+from preggy import expect
+
+from libthumbor.bulk import Progress, coerce_options, iter_sign, main
+from libthumbor.crypto import CryptoURL
+
+KEY = "my-security-key"
+
+
+class CoerceOptionsTestCase(TestCase):
+    def test_converts_csv_values(self):
+        options = coerce_options(
+            {
+                "image_url": "my.server.com/image.jpg",
+                "width": "300",
+                "height": "-200",
+                "smart": "True",
+                "fit_in": "0",
+                "crop": "10x20:30x40",
+                "trim": "top-left:10",
+                "filters": "quality(80):fill(red)",
+                "halign": "",
+            }
+        )
+
+        expect(options).to_equal(
+            {
+                "image_url": "my.server.com/image.jpg",
+                "width": 300,
+                "height": -200,
+                "smart": True,
+                "fit_in": False,
+                "crop": ((10, 20), (30, 40)),
+                "trim": ("top-left", 10),
+                "filters": ("quality(80)", "fill(red)"),
+            }
+        )
+
+    def test_rejects_dimensions_that_are_not_integers(self):
+        for value in ("abc", "300px", "1.5"):
+            with expect.error_to_happen(
+                ValueError, message=f"The width value '{value}' is not an integer."
+            ):
+                coerce_options({"image_url": "a.jpg", "width": value})
+
+    def test_keeps_typed_values(self):
+        options = {"image_url": "a.jpg", "width": 300, "smart": True, "trim": True}
+
+        expect(coerce_options(options)).to_equal(options)
+
+
+class BulkSignTestCase(TestCase):
+    def setUp(self):
+        self.crypto = CryptoURL(KEY)
+        self.options = [
+            {"image_url": f"my.server.com/{index}.jpg", "width": 300, "smart": True}
+            for index in range(10)
+        ]
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.output = os.path.join(self.directory, "urls.txt")
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8") as stream:
+            stream.write(content)
+        return path
+
+    def read_output(self):
+        with open(self.output, encoding="utf-8") as stream:
+            return stream.read().splitlines()
+
+    def test_signs_json_lines_in_order(self):
+        path = self.write(
+            "catalog.jsonl", "".join(f"{json.dumps(item)}\n" for item in self.options)
+        )
+
+        status = main([path, "-k", KEY, "-o", self.output, "-w", "1", "-c", "3", "-q"])
+
+        expect(status).to_equal(0)
+        expect(self.read_output()).to_equal(self.crypto.generate_many(self.options))
+
+    def test_skips_blank_lines_whatever_the_chunk_size(self):
+        path = self.write(
+            "catalog.jsonl",
+            "".join(f"\n{json.dumps(item)}\n\n" for item in self.options[:2]),
+        )
+
+        status = main([path, "-k", KEY, "-o", self.output, "-w", "1", "-c", "1", "-q"])
+
+        expect(status).to_equal(0)
+        expect(self.read_output()).to_equal(self.crypto.generate_many(self.options[:2]))
+
+    def test_signs_csv(self):
+        path = self.write(
+            "catalog.csv",
+            "image_url,width,smart,filters\n"
+            "my.server.com/0.jpg,300,true,quality(80)\n"
+            "my.server.com/1.jpg,,false,\n",
+        )
+
+        with mock.patch.dict(os.environ, {"THUMBOR_SECURITY_KEY": KEY}):
+            status = main([path, "-o", self.output, "-w", "1", "-q"])
+
+        expect(status).to_equal(0)
+        expect(self.read_output()).to_equal(
+            [
+                self.crypto.generate(
+                    image_url="my.server.com/0.jpg",
+                    width=300,
+                    smart=True,
+                    filters=["quality(80)"],
+                ),
+                self.crypto.generate(image_url="my.server.com/1.jpg"),
+            ]
+        )
+
+    def test_reports_the_line_at_fault(self):
+        path = self.write(
+            "catalog.jsonl",
+            '{"image_url": "a.jpg"}\n\n{"width": 300}\n',
+        )
+        stderr = io.StringIO()
+
+        with mock.patch("sys.stderr", stderr):
+            status = main([path, "-k", KEY, "-o", self.output, "-w", "1", "-q"])
+
+        expect(status).to_equal(1)
+        expect(stderr.getvalue()).to_equal(
+            "libthumbor-bulk: line 3: The image_url argument is mandatory.\n"
+        )
+
+    def test_reports_invalid_csv_values(self):
+        path = self.write(
+            "catalog.csv",
+            "image_url,width\nmy.server.com/0.jpg,300\nmy.server.com/1.jpg,300px\n",
+        )
+        stderr = io.StringIO()
+
+        with mock.patch("sys.stderr", stderr):
+            status = main([path, "-k", KEY, "-o", self.output, "-w", "1", "-q"])
+
+        expect(status).to_equal(1)
+        expect(stderr.getvalue()).to_equal(
+            "libthumbor-bulk: line 3: The width value '300px' is not an integer.\n"
+        )
+
+    def test_signs_on_worker_processes(self):
+        records = [json.dumps(item) for item in self.options]
+
+        chunks = list(iter_sign(records, KEY, workers=2, chunk_size=3))
+
+        expect([len(chunk) for chunk in chunks]).to_equal([3, 3, 3, 1])
+        expect(sum(chunks, [])).to_equal(self.crypto.generate_many(self.options))
+
+    def test_reports_progress(self):
+        stream = io.StringIO()
+        now = [0]
+        progress = Progress(stream, interval=1, timer=lambda: now[0])
+
+        progress.update(500)
+        now[0] = 2
+        progress.update(1500)
+
+        expect(stream.getvalue()).to_equal("signed 2,000 urls (1,000 urls/s)\n")
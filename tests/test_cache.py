@@ -0,0 +1,76 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""libthumbor LRU cache tests"""
+
+from unittest import TestCase
+
+from preggy import expect
+
+from libthumbor.cache import CacheInfo, LRUCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class LRUCacheTestCase(TestCase):
+    def test_requires_positive_maxsize(self):
+        with expect.error_to_happen(
+            ValueError, message="The cache maxsize must be a positive integer."
+        ):
+            LRUCache(0)
+
+    def test_counts_hits_and_misses(self):
+        cache = LRUCache(2)
+
+        expect(cache.get("a")).to_be_null()
+        cache.set("a", 1)
+        expect(cache.get("a")).to_equal(1)
+
+        expect(cache.info()).to_equal(CacheInfo(1, 1, 0, 2, 1))
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        expect(cache.get("b")).to_be_null()
+        expect(cache.get("a")).to_equal(1)
+        expect(cache.get("c")).to_equal(3)
+        expect(cache.info().evictions).to_equal(1)
+
+    def test_expires_entries_after_ttl(self):
+        timer = FakeTimer()
+        cache = LRUCache(2, ttl=10, timer=timer)
+        cache.set("a", 1)
+
+        timer.now = 9
+        expect(cache.get("a")).to_equal(1)
+
+        timer.now = 10
+        expect(cache.get("a")).to_be_null()
+        expect(len(cache)).to_equal(0)
+        expect(cache.info()).to_equal(CacheInfo(1, 1, 1, 2, 0))
+
+    def test_clear_resets_entries_and_counters(self):
+        cache = LRUCache(2)
+        cache.set("a", 1)
+        cache.get("a")
+
+        cache.clear()
+
+        expect(cache.info()).to_equal(CacheInfo(0, 0, 0, 2, 0))
@@ -0,0 +1,137 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""libthumbor columnar signing tests"""
+
+from unittest import TestCase, skipIf
+
+from preggy import expect
+
+from libthumbor.columnar import sign_column, sign_urls
+from libthumbor.crypto import CryptoURL
+from libthumbor.url_signers.multi_key import MultiKeyUrlSigner
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+KEY = "my-security-key"
+PRESET = {"fit_in": True, "width": 300, "height": 200, "filters": ["quality(80)"]}
+IMAGES = ["my.server.com/1.jpg", "my.server.com/é 2.jpg", None, "my.server.com/3.jpg"]
+
+
+class NotAvailable:
+    """Stands for pandas.NA, the missing value of pandas string columns"""
+
+    def __ne__(self, other):
+        return self
+
+    def __bool__(self):
+        raise TypeError("boolean value of NA is ambiguous")
+
+
+class SignUrlsTestCase(TestCase):
+    def setUp(self):
+        self.crypto = CryptoURL(KEY)
+
+    def expected(self, crypto=None):
+        crypto = crypto or self.crypto
+        return [
+            None if image is None else crypto.generate(image_url=image, **PRESET)
+            for image in IMAGES
+        ]
+
+    def test_signs_like_generate(self):
+        expect(sign_urls(self.crypto, IMAGES, **PRESET)).to_equal(self.expected())
+
+    def test_signs_with_any_signer(self):
+        for signer in (
+            "libthumbor.url_signers.base64_hmac_sha256",
+            "libthumbor.url_signers.base64_blake2b",
+        ):
+            crypto = CryptoURL(KEY, signer=signer)
+
+            expect(sign_urls(crypto, IMAGES, **PRESET)).to_equal(self.expected(crypto))
+
+    def test_signs_without_a_hasher(self):
+        crypto = CryptoURL(KEY)
+        crypto.signer = MultiKeyUrlSigner([KEY, "previous-key"])
+        crypto.hmac = None
+
+        expect(sign_urls(crypto, IMAGES, **PRESET)).to_equal(self.expected())
+
+    def test_keeps_missing_values(self):
+        urls = sign_urls(self.crypto, [float("nan"), None, b"my.server.com/1.jpg"])
+
+        expect(urls[:2]).to_equal([None, None])
+        expect(urls[2]).to_equal(self.crypto.generate(image_url="my.server.com/1.jpg"))
+
+    def test_keeps_missing_values_of_string_columns(self):
+        urls = sign_urls(self.crypto, [NotAvailable(), "my.server.com/1.jpg"])
+
+        expect(urls).to_equal(
+            [None, self.crypto.generate(image_url="my.server.com/1.jpg")]
+        )
+
+    def test_signs_unsafe_urls(self):
+        urls = sign_urls(self.crypto, IMAGES, unsafe=True, width=300)
+
+        expect(urls[0]).to_equal("unsafe/300x0/my.server.com/1.jpg")
+        expect(urls[2]).to_be_null()
+
+
+class SignColumnTestCase(TestCase):
+    def setUp(self):
+        self.crypto = CryptoURL(KEY)
+        self.expected = sign_urls(self.crypto, IMAGES, **PRESET)
+
+    def test_signs_lists_and_tuples(self):
+        expect(sign_column(self.crypto, IMAGES, **PRESET)).to_equal(self.expected)
+        expect(sign_column(self.crypto, tuple(IMAGES), **PRESET)).to_equal(
+            self.expected
+        )
+
+    @skipIf(numpy is None, "numpy must be present to run this test")
+    def test_signs_numpy_arrays(self):
+        urls = sign_column(self.crypto, numpy.array(IMAGES, dtype=object), **PRESET)
+
+        expect(urls.dtype).to_equal(numpy.dtype(object))
+        expect(urls.tolist()).to_equal(self.expected)
+
+    @skipIf(pandas is None, "pandas must be present to run this test")
+    def test_signs_pandas_series(self):
+        column = pandas.Series(IMAGES, index=[10, 20, 30, 40], name="image")
+
+        urls = sign_column(self.crypto, column, **PRESET)
+
+        expect(urls.index.tolist()).to_equal([10, 20, 30, 40])
+        expect(urls.name).to_equal("image")
+        expect(urls.tolist()).to_equal(self.expected)
+
+    @skipIf(pyarrow is None, "pyarrow must be present to run this test")
+    def test_signs_pyarrow_arrays(self):
+        urls = sign_column(self.crypto, pyarrow.array(IMAGES), **PRESET)
+        chunked = sign_column(
+            self.crypto, pyarrow.chunked_array([IMAGES[:2], IMAGES[2:]]), **PRESET
+        )
+
+        expect(urls.to_pylist()).to_equal(self.expected)
+        expect(chunked.to_pylist()).to_equal(self.expected)
@@ -10,12 +10,16 @@
 
 """libthumbor cryptography tests"""
 
-from unittest import TestCase
+from unittest import TestCase, mock
 
 from preggy import expect
 from six import ensure_text
 
-from libthumbor.crypto import CryptoURL
+from libthumbor.crypto import _PREFIX_STATES_MAXSIZE, CryptoURL, _prefix_state
+from libthumbor.url import plain_image_url
+from libthumbor.url_signers import base64_blake2b, base64_hmac_sha256
+from libthumbor.url_signers.base64_hmac_sha1 import UrlSigner
+from libthumbor.url_signers.multi_key import MultiKeyUrlSigner
 
 IMAGE_URL = "my.server.com/some/path/to/image.jpg"
 KEY = b"my-security-key"
@@ -80,6 +84,17 @@ class NewFormatUrl(TestCase, NewFormatUrlTestsMixin):
     def setUp(self):
         self.crypto = CryptoURL(KEY)
 
+    def test_hmac_is_a_copy_of_the_shared_hasher(self):
+        url = self.crypto.generate(image_url=IMAGE_URL, width=300)
+
+        CryptoURL(KEY).hmac.update(b"x")
+
+        expect(CryptoURL(KEY).hmac is CryptoURL(KEY).hmac).to_be_false()
+        expect(CryptoURL(KEY).generate(image_url=IMAGE_URL, width=300)).to_equal(url)
+        expect(
+            UrlSigner(KEY).validate(url.split("/")[1], url.split("/", 2)[2])
+        ).to_be_true()
+
 
 class NewFormatUrlWithUnicodeKey(TestCase, NewFormatUrlTestsMixin):
     def setUp(self):
@@ -101,3 +116,347 @@ class GenerateWithUnsafeTestCase(TestCase):
             image_url=IMAGE_URL, crop=((10, 20), (30, 40)), unsafe=False
         )
         expect(url.startswith("unsafe")).to_be_false()
+
+
+class GenerateManyTestCase(TestCase):
+    def setUp(self):
+        self.crypto = CryptoURL(KEY)
+
+    def test_should_generate_the_same_urls_as_generate(self):
+        options = [
+            {"image_url": IMAGE_URL, "width": 300, "height": 200},
+            {"image_url": "other.server.com/image.jpg", "width": 300, "height": 200},
+            {
+                "image_url": IMAGE_URL,
+                "width": 300,
+                "height": 200,
+                "crop": ((10, 10), (200, 200)),
+                "filters": ["brightness(20)", "contrast(10)"],
+            },
+            {"image_url": IMAGE_URL, "width": 300, "unsafe": True},
+        ]
+
+        urls = self.crypto.generate_many(options)
+
+        expect(urls).to_equal([self.crypto.generate(**item) for item in options])
+
+    def test_should_not_mix_options_of_different_types(self):
+        urls = self.crypto.generate_many(
+            [
+                {"image_url": IMAGE_URL, "width": 300},
+                {"image_url": IMAGE_URL, "width": 300.0},
+            ]
+        )
+
+        expect(urls[0]).to_include("/300x0/")
+        expect(urls[1]).to_include("/300.0x0/")
+
+    def test_should_not_mix_nested_values_of_different_types(self):
+        options = [
+            {"image_url": IMAGE_URL, "crop": ((10, 20), (30, 40))},
+            {"image_url": IMAGE_URL, "crop": ((10.0, 20), (30, 40))},
+            {"image_url": IMAGE_URL, "trim": ("top-left", 1)},
+            {"image_url": IMAGE_URL, "trim": ("top-left", 1.0)},
+        ]
+
+        urls = self.crypto.generate_many(options)
+
+        expect(urls).to_equal([self.crypto.generate(**item) for item in options])
+        expect(urls[1]).to_include("/10.0x20:30x40/")
+
+    def test_should_raise_if_image_url_is_missing(self):
+        generated = self.crypto.iter_generate(
+            [{"image_url": IMAGE_URL, "width": 300}, {"width": 300}]
+        )
+        next(generated)
+
+        with expect.error_to_happen(
+            ValueError, message="The image_url argument is mandatory."
+        ):
+            next(generated)
+
+    def test_iter_generate_is_lazy(self):
+        def options():
+            yield {"image_url": IMAGE_URL, "width": 300, "height": 200}
+            raise AssertionError("should not be consumed")
+
+        url = next(self.crypto.iter_generate(options()))
+
+        expect(url).to_equal(
+            "/8ammJH8D-7tXy6kU3lTvoXlhu4o=/300x200/my.server.com/some/path/to/image.jpg"
+        )
+
+    def test_should_reuse_prefixes_of_lists_and_tuples(self):
+        options = [
+            {"image_url": IMAGE_URL, "filters": ["blur(1)"], "crop": [[1, 2], [3, 4]]},
+            {"image_url": "a.jpg", "filters": ("blur(1)",), "crop": ((1, 2), (3, 4))},
+            {"image_url": "b.jpg", "filters": ["blur(2)"], "crop": [[1, 2], [3, 4]]},
+        ]
+
+        urls = self.crypto.generate_many(options)
+
+        expect(urls).to_equal([self.crypto.generate(**item) for item in options])
+
+    def test_should_not_grow_prefixes_forever(self):
+        with mock.patch("libthumbor.crypto._PREFIXES_MAXSIZE", 2):
+            urls = self.crypto.generate_many(
+                {"image_url": IMAGE_URL, "width": width % 3} for width in range(10)
+            )
+
+        expect(urls).to_equal(
+            [
+                self.crypto.generate(image_url=IMAGE_URL, width=width % 3)
+                for width in range(10)
+            ]
+        )
+
+
+class CachedCryptoURLTestCase(TestCase):
+    def setUp(self):
+        self.crypto = CryptoURL(KEY, cache_size=2)
+
+    def test_cache_is_disabled_by_default(self):
+        expect(CryptoURL(KEY).cache_info()).to_be_null()
+
+    def test_should_return_the_same_url_from_cache(self):
+        options = {"image_url": IMAGE_URL, "width": 300, "height": 200}
+
+        first = self.crypto.generate(**options)
+        second = self.crypto.generate(height=200, width=300, image_url=IMAGE_URL)
+
+        expect(first).to_equal(second)
+        expect(first).to_equal(
+            "/8ammJH8D-7tXy6kU3lTvoXlhu4o=/300x200/my.server.com/some/path/to/image.jpg"
+        )
+        expect(self.crypto.cache_info().hits).to_equal(1)
+        expect(self.crypto.cache_info().misses).to_equal(1)
+
+    def test_should_key_cache_on_filters_content(self):
+        first = self.crypto.generate(image_url=IMAGE_URL, filters=["blur(1)"])
+        second = self.crypto.generate(image_url=IMAGE_URL, filters=["blur(2)"])
+
+        expect(first).not_to_equal(second)
+        expect(self.crypto.cache_info().misses).to_equal(2)
+
+    def test_should_key_cache_on_nested_value_types(self):
+        for options in (
+            {"crop": ((10, 20), (30, 40))},
+            {"crop": ((10.0, 20), (30, 40))},
+            {"trim": ("top-left", 1)},
+            {"trim": ("top-left", 1.0)},
+        ):
+            expect(self.crypto.generate(image_url=IMAGE_URL, **options)).to_equal(
+                CryptoURL(KEY).generate(image_url=IMAGE_URL, **options)
+            )
+
+        expect(self.crypto.cache_info().hits).to_equal(0)
+
+    def test_should_count_evictions(self):
+        for width in (100, 200, 300):
+            self.crypto.generate(image_url=IMAGE_URL, width=width)
+
+        expect(self.crypto.cache_info().evictions).to_equal(1)
+        expect(self.crypto.cache_info().currsize).to_equal(2)
+
+
+class GenerateBytesTestCase(TestCase):
+    def setUp(self):
+        self.crypto = CryptoURL(KEY)
+        self.options = {"width": 300, "height": 200, "filters": ["quality(80)"]}
+
+    def test_should_generate_the_same_url_as_generate(self):
+        expected = self.crypto.generate(image_url=IMAGE_URL, **self.options)
+
+        for image_url in (
+            IMAGE_URL,
+            IMAGE_URL.encode("utf-8"),
+            memoryview(IMAGE_URL.encode("utf-8")),
+        ):
+            url = self.crypto.generate_bytes(image_url=image_url, **self.options)
+
+            expect(url).to_be_instance_of(bytes)
+            expect(url).to_equal(expected.encode("utf-8"))
+
+    def test_should_keep_non_ascii_image_urls(self):
+        image_url = "my.server.com/imagé.jpg"
+
+        expect(self.crypto.generate_bytes(image_url=image_url.encode())).to_equal(
+            self.crypto.generate(image_url=image_url).encode("utf-8")
+        )
+
+    def test_should_append_into_a_buffer(self):
+        buffer = bytearray(b"Location: ")
+
+        size = self.crypto.sign_into(buffer, image_url=IMAGE_URL, width=300, height=200)
+
+        expect(bytes(buffer)).to_equal(
+            b"Location: /8ammJH8D-7tXy6kU3lTvoXlhu4o=/300x200/"
+            b"my.server.com/some/path/to/image.jpg"
+        )
+        expect(size).to_equal(len(buffer) - len(b"Location: "))
+
+    def test_should_generate_unsafe_urls(self):
+        expect(
+            self.crypto.generate_bytes(image_url=b"image.jpg", unsafe=True, width=300)
+        ).to_equal(b"unsafe/300x0/image.jpg")
+
+    def test_should_sign_with_signers_without_hasher(self):
+        crypto = CryptoURL(KEY)
+        crypto.signer = MultiKeyUrlSigner([KEY, b"previous-key"])
+        crypto.hmac = None
+
+        expect(crypto.generate_bytes(image_url=IMAGE_URL.encode())).to_equal(
+            self.crypto.generate(image_url=IMAGE_URL).encode("utf-8")
+        )
+
+    def test_should_raise_if_image_url_is_missing(self):
+        with expect.error_to_happen(
+            ValueError, message="The image_url argument is mandatory."
+        ):
+            self.crypto.sign_into(bytearray(), width=300)
+
+
+class UrlTemplateTestCase(TestCase):
+    def setUp(self):
+        self.crypto = CryptoURL(KEY)
+
+    def test_should_generate_the_same_url_as_generate(self):
+        options = {
+            "width": 300,
+            "height": 200,
+            "crop": ((10, 10), (200, 200)),
+            "filters": ("brightness(20)", "contrast(10)"),
+        }
+        template = self.crypto.template(**options)
+
+        expect(template(IMAGE_URL)).to_equal(
+            self.crypto.generate(image_url=IMAGE_URL, **options)
+        )
+
+    def test_should_generate_url_without_options(self):
+        template = self.crypto.template()
+
+        expect(template(IMAGE_URL)).to_equal(self.crypto.generate(image_url=IMAGE_URL))
+
+    def test_should_generate_unsafe_urls(self):
+        template = self.crypto.template(unsafe=True, fit_in=True, width=300)
+
+        expect(template(IMAGE_URL)).to_equal(
+            "unsafe/fit-in/300x0/my.server.com/some/path/to/image.jpg"
+        )
+
+    def test_should_validate_options_when_compiled(self):
+        with expect.error_to_happen(ValueError):
+            self.crypto.template(halign="wrong")
+
+    def test_should_not_accept_image_url(self):
+        with expect.error_to_happen(
+            ValueError, message="The image_url argument is not allowed in templates."
+        ):
+            self.crypto.template(image_url=IMAGE_URL)
+
+    def test_should_generate_many(self):
+        template = self.crypto.template(width=300, height=200)
+
+        expect(template.generate_many([IMAGE_URL, IMAGE_URL])).to_equal(
+            [
+                "/8ammJH8D-7tXy6kU3lTvoXlhu4o=/300x200/my.server.com/some/path/to/image.jpg"
+            ]
+            * 2
+        )
+
+
+class PrefixStateTestCase(TestCase):
+    def setUp(self):
+        self.crypto = CryptoURL(KEY)
+        self.options = {"fit_in": True, "width": 300, "filters": ["quality(80)"]}
+
+    def signed_with_signer(self, **options):
+        url = plain_image_url(**options)
+        return f"/{self.crypto.signer.signature(url).decode('ascii')}/{url}"
+
+    def test_should_sign_like_the_signer(self):
+        for signer in (
+            "libthumbor.url_signers.base64_hmac_sha1",
+            "libthumbor.url_signers.base64_hmac_sha256",
+            "libthumbor.url_signers.base64_blake2b",
+        ):
+            self.crypto = CryptoURL(KEY, signer=signer)
+            image_urls = (IMAGE_URL, "my.server.com/imagé.jpg", "")
+            expected = [
+                self.signed_with_signer(image_url=image_url, **self.options)
+                for image_url in image_urls
+            ]
+
+            expect(
+                [
+                    self.crypto.generate(image_url=image_url, **self.options)
+                    for image_url in image_urls
+                ]
+            ).to_equal(expected)
+            expect(
+                self.crypto.generate_many(
+                    [
+                        {"image_url": image_url, **self.options}
+                        for image_url in image_urls
+                    ]
+                )
+            ).to_equal(expected)
+            expect(
+                self.crypto.template(**self.options).generate_many(image_urls)
+            ).to_equal(expected)
+
+    def test_should_share_states_of_the_same_prefix(self):
+        template = self.crypto.template(**self.options)
+        other = CryptoURL(KEY).template(**self.options)
+
+        expect(other.state is template.state).to_be_true()
+        expect(self.crypto.template(width=300).state is template.state).to_be_false()
+
+    def test_should_not_change_the_shared_state(self):
+        template = self.crypto.template(**self.options)
+
+        first = template(IMAGE_URL)
+        template("my.server.com/other.jpg")
+
+        expect(template(IMAGE_URL)).to_equal(first)
+
+    def test_should_keep_a_bounded_number_of_states(self):
+        for width in range(_PREFIX_STATES_MAXSIZE + 10):
+            self.crypto.generate(image_url=IMAGE_URL, width=width)
+
+        expect(_prefix_state.cache_info().currsize).to_equal(_PREFIX_STATES_MAXSIZE)
+
+    def test_should_not_keep_states_for_signers_without_hasher(self):
+        self.crypto.signer = MultiKeyUrlSigner([KEY, b"previous-key"])
+        self.crypto.hmac = None
+
+        expect(self.crypto.template(**self.options).state).to_be_null()
+        expect(self.crypto.generate(image_url=IMAGE_URL, **self.options)).to_equal(
+            CryptoURL(KEY).generate(image_url=IMAGE_URL, **self.options)
+        )
+
+    def test_should_raise_if_image_url_is_not_text(self):
+        with expect.error_to_happen(TypeError):
+            self.crypto.generate(image_url=300, width=300)
+
+
+class CryptoURLSignerTestCase(TestCase):
+    def test_should_sign_with_the_given_signer(self):
+        crypto = CryptoURL(KEY, signer=base64_hmac_sha256.UrlSigner)
+        signer = base64_hmac_sha256.UrlSigner(KEY)
+
+        url = crypto.generate(image_url=IMAGE_URL, width=300, height=200)
+
+        expect(url).to_equal(
+            f"/{signer.signature('300x200/' + IMAGE_URL).decode('ascii')}"
+            f"/300x200/{IMAGE_URL}"
+        )
+
+    def test_should_load_signer_by_module_name(self):
+        crypto = CryptoURL(KEY, signer="libthumbor.url_signers.base64_blake2b")
+
+        expect(crypto.signer).to_be_instance_of(base64_blake2b.UrlSigner)
+        expect(crypto.generate_many([{"image_url": IMAGE_URL}])).to_equal(
+            [crypto.generate(image_url=IMAGE_URL)]
+        )
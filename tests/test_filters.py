@@ -0,0 +1,117 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""libthumbor filter model tests"""
+
+import pickle
+from unittest import TestCase
+
+from preggy import expect
+
+from libthumbor.crypto import CryptoURL
+from libthumbor.filters import Filter, FilterChain, parse_filters
+from libthumbor.url import Url
+
+FILTERS = "brightness(10):watermark(a.com/logo.png,10,-20,50):blur(1.5):fill(red):x(01)"
+
+
+class FilterTestCase(TestCase):
+    def test_renders_its_url_form(self):
+        item = Filter("watermark", "a.com/logo.png", 10, -20, 50)
+
+        expect(item).to_equal("watermark(a.com/logo.png,10,-20,50)")
+        expect(item.name).to_equal("watermark")
+        expect(item.args).to_equal(("a.com/logo.png", 10, -20, 50))
+        expect(Filter("grayscale")).to_equal("grayscale()")
+
+    def test_parses_typed_arguments(self):
+        item = Filter.parse("x(red,10,-2,1.5,01,2.50,inf)")
+
+        expect(item.args).to_equal(("red", 10, -2, 1.5, "01", "2.50", "inf"))
+        expect(item).to_equal("x(red,10,-2,1.5,01,2.50,inf)")
+
+    def test_validates_known_filters(self):
+        with expect.error_to_happen(
+            ValueError,
+            message="Wrong number of arguments for the quality filter: expected 1, got 0.",
+        ):
+            Filter("quality")
+
+        with expect.error_to_happen(
+            ValueError,
+            message="Wrong number of arguments for the blur filter: expected 1 to 2, got 3.",
+        ):
+            Filter.parse("blur(1,2,3)")
+
+        expect(Filter("my_custom_filter", 1, 2, 3, 4)).to_equal(
+            "my_custom_filter(1,2,3,4)"
+        )
+
+    def test_refuses_invalid_filters(self):
+        for text in ("blur", "blur(1", "(1)"):
+            with expect.error_to_happen(ValueError):
+                Filter.parse(text)
+
+    def test_can_be_pickled(self):
+        item = Filter("fill", "red", 1)
+
+        expect(pickle.loads(pickle.dumps(item)).args).to_equal(("red", 1))
+
+
+class FilterChainTestCase(TestCase):
+    def test_parses_a_chain(self):
+        chain = parse_filters(FILTERS)
+
+        expect(chain.names).to_equal(["brightness", "watermark", "blur", "fill", "x"])
+        expect(chain.get("blur").args).to_equal((1.5,))
+        expect(chain.get("quality")).to_be_null()
+        expect(str(chain)).to_equal(FILTERS)
+
+    def test_parsed_chains_are_cached_and_interned(self):
+        chain = parse_filters(FILTERS)
+
+        expect(parse_filters(FILTERS) is chain).to_be_true()
+        expect(FilterChain(chain).serialized is chain.serialized).to_be_true()
+
+    def test_can_be_built_and_extended(self):
+        chain = FilterChain([Filter("brightness", 10), "contrast(5)"])
+
+        expect(chain + Filter("quality", 80)).to_equal(
+            FilterChain("brightness(10):contrast(5):quality(80)")
+        )
+        expect(str(chain + ["grayscale()"])).to_equal(
+            "brightness(10):contrast(5):grayscale()"
+        )
+        expect(FilterChain()).to_equal(())
+
+    def test_can_be_pickled(self):
+        chain = parse_filters(FILTERS)
+
+        expect(str(pickle.loads(pickle.dumps(chain)))).to_equal(FILTERS)
+
+    def test_generates_the_same_urls_as_strings(self):
+        crypto = CryptoURL("my-security-key")
+        chain = parse_filters(FILTERS)
+
+        expect(crypto.generate(image_url="a.jpg", width=30, filters=chain)).to_equal(
+            crypto.generate(image_url="a.jpg", width=30, filters=FILTERS.split(":"))
+        )
+        expect(
+            crypto.generate(image_url="a.jpg", filters=Filter("quality", 80))
+        ).to_equal(crypto.generate(image_url="a.jpg", filters=["quality(80)"]))
+        expect(crypto.generate(image_url="a.jpg", filters=FilterChain())).to_equal(
+            crypto.generate(image_url="a.jpg")
+        )
+        expect(Url.generate_options(filters=chain)).to_equal(f"filters:{FILTERS}")
+
+    def test_parsed_url_gives_its_filter_chain(self):
+        parsed = Url.parse_decrypted(f"filters:{FILTERS}/a.jpg", as_object=True)
+
+        expect(parsed.filter_chain is parse_filters(FILTERS)).to_be_true()
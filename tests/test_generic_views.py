@@ -10,7 +10,10 @@
 
 """libthumbor generic views tests"""
 
+import json
 import os
+import threading
+from unittest import mock
 
 import pytest
 from preggy import expect
@@ -22,13 +25,17 @@ os.environ["DJANGO_SETTINGS_MODULE"] = "tests.testproj.testproj.settings"
 try:
     from django.conf import settings
     from django.http import QueryDict
-    from django.test import TestCase
+    from django.test import Client, TestCase, override_settings
+
+    from libthumbor.django import views
 
     DJANGO_PRESENT = True
 except ImportError:
     DJANGO_PRESENT = False
 
 
+HTTP_NOT_MODIFIED = 304
+HTTP_FORBIDDEN = 403
 HTTP_NOT_FOUND = 404
 HTTP_METHOD_NOT_ALLOWED = 405
 HTTP_OK = 200
@@ -168,3 +175,351 @@ class GenericViewsTestCase(TestCase):
         expect(response.content).to_equal(
             settings.THUMBOR_SERVER + crypto.generate(**image_args).strip("/")
         )
+
+    def test_generate_url_with_configured_signer(self):
+        signer = "libthumbor.url_signers.base64_hmac_sha256"
+        crypto = CryptoURL(settings.THUMBOR_SECURITY_KEY, signer=signer)
+        image_args = {"image_url": "globo.com/media/img/my_image.jpg"}
+        self.url_query.update(image_args)
+
+        with override_settings(THUMBOR_URL_SIGNER=signer):
+            response = self.client.get("/gen_url/?" + self.url_query.urlencode())
+
+        expect(response.status_code).to_equal(HTTP_OK)
+        expect(response.content).to_equal(
+            settings.THUMBOR_SERVER + crypto.generate(**image_args).strip("/")
+        )
+
+    def test_reads_settings_again_when_they_change(self):
+        image_args = {"image_url": "globo.com/media/img/my_image.jpg"}
+        self.url_query.update(image_args)
+        query = "/gen_url/?" + self.url_query.urlencode()
+
+        first = self.client.get(query)
+        with override_settings(
+            THUMBOR_SECURITY_KEY="other-key", THUMBOR_SERVER="https://thumbor/"
+        ):
+            second = self.client.get(query)
+
+        expect(first.content).to_equal(
+            settings.THUMBOR_SERVER
+            + CryptoURL(settings.THUMBOR_SECURITY_KEY).generate(**image_args).strip("/")
+        )
+        expect(second.content).to_equal(
+            "https://thumbor/"
+            + CryptoURL("other-key").generate(**image_args).strip("/")
+        )
+
+    def test_keeps_the_module_settings_names(self):
+        expect(views.THUMBOR_SECURITY_KEY).to_equal(settings.THUMBOR_SECURITY_KEY)
+        expect(views.THUMBOR_SERVER).to_equal(settings.THUMBOR_SERVER)
+
+        with override_settings(THUMBOR_SERVER="https://thumbor/"):
+            expect(views.THUMBOR_SERVER).to_equal("https://thumbor/")
+
+    def test_reuses_signers_and_responses(self):
+        self.url_query.update({"image_url": "globo.com/media/img/my_image.jpg"})
+        query = "/gen_url/?" + self.url_query.urlencode()
+        views.clear_caches("THUMBOR_SECURITY_KEY")
+
+        with mock.patch(
+            "libthumbor.django.views._generate_url", wraps=views._generate_url
+        ) as generate:
+            first = self.client.get(query)
+            second = self.client.get(query)
+
+        expect(generate.call_count).to_equal(1)
+        expect(second.content).to_equal(first.content)
+        expect(views.get_crypto(settings.THUMBOR_SECURITY_KEY)).to_equal(
+            views.get_crypto(settings.THUMBOR_SECURITY_KEY)
+        )
+
+    def test_response_cache_can_be_disabled(self):
+        self.url_query.update({"image_url": "globo.com/media/img/my_image.jpg"})
+        query = "/gen_url/?" + self.url_query.urlencode()
+
+        with override_settings(THUMBOR_RESPONSE_CACHE_SIZE=0):
+            with mock.patch(
+                "libthumbor.django.views._generate_url", wraps=views._generate_url
+            ) as generate:
+                self.client.get(query)
+                response = self.client.get(query)
+
+        expect(generate.call_count).to_equal(2)
+        expect(response.status_code).to_equal(HTTP_OK)
+
+    def test_answers_not_modified_for_a_matching_etag(self):
+        self.url_query.update({"image_url": "globo.com/media/img/my_image.jpg"})
+        query = "/gen_url/?" + self.url_query.urlencode()
+
+        etag = self.client.get(query)["ETag"]
+        response = self.client.get(query, HTTP_IF_NONE_MATCH=etag)
+
+        expect(etag).to_match(r'^"[0-9a-f]{32}"$')
+        expect(response.status_code).to_equal(HTTP_NOT_MODIFIED)
+
+    def test_sets_the_configured_cache_control(self):
+        self.url_query.update({"image_url": "globo.com/media/img/my_image.jpg"})
+        query = "/gen_url/?" + self.url_query.urlencode()
+
+        with override_settings(
+            THUMBOR_CACHE_CONTROL="public, max-age=3600", THUMBOR_USE_ETAGS=False
+        ):
+            response = self.client.get(query)
+
+        expect(response["Cache-Control"]).to_equal("public, max-age=3600")
+        expect(response.has_header("ETag")).to_be_false()
+        expect(self.client.get(query).has_header("Cache-Control")).to_be_false()
+
+
+@pytest.mark.skip_if(not DJANGO_PRESENT, "django must be present to run this test")
+class GenerateUrlsViewTestCase(TestCase):
+    def setUp(self):
+        self.crypto = CryptoURL(settings.THUMBOR_SECURITY_KEY)
+
+    def post(self, items, **kwargs):
+        return self.client.post(
+            "/gen_urls/",
+            items if isinstance(items, str) else json.dumps(items),
+            content_type="application/json",
+            **kwargs,
+        )
+
+    def url(self, **options):
+        return settings.THUMBOR_SERVER + self.crypto.generate(**options).strip("/")
+
+    def test_signs_each_option_set_in_order(self):
+        response = self.post(
+            [
+                {"image_url": "globo.com/1.jpg", "width": 300, "height": "200"},
+                {
+                    "image_url": "globo.com/2.jpg",
+                    "fit_in": True,
+                    "width": 100,
+                    "filters": ["quality(80)"],
+                    "crop_left": 10,
+                    "crop_top": 20,
+                    "crop_right": 30,
+                    "crop_bottom": 40,
+                },
+            ]
+        )
+
+        expect(response.status_code).to_equal(HTTP_OK)
+        expect(response.json()).to_equal(
+            [
+                self.url(image_url="globo.com/1.jpg", width=300, height=200),
+                self.url(
+                    image_url="globo.com/2.jpg",
+                    fit_in=True,
+                    width=100,
+                    filters=["quality(80)"],
+                    crop=((10, 20), (30, 40)),
+                ),
+            ]
+        )
+
+    def test_reports_errors_per_item(self):
+        response = self.post(
+            [
+                {"image_url": "globo.com/1.jpg"},
+                {"image_url": "globo.com/2.jpg", "width": "aaa"},
+                {"width": 300},
+                {"image_url": "globo.com/3.jpg", "height": [1]},
+                "globo.com/4.jpg",
+            ]
+        )
+
+        expect(response.status_code).to_equal(HTTP_OK)
+        expect(response.json()).to_equal(
+            [
+                self.url(image_url="globo.com/1.jpg"),
+                {"error": "The width value 'aaa' is not an integer."},
+                {"error": "Invalid thumbor URL parameters."},
+                {"error": "The height value '[1]' is not an integer."},
+                {"error": "Each item must be a JSON object of options."},
+            ]
+        )
+
+    def test_reports_malformed_options_without_failing_the_batch(self):
+        response = self.post(
+            [
+                {"image_url": "globo.com/1.jpg"},
+                {"image_url": "globo.com/2.jpg", "crop": [[1, 2]]},
+                {"image_url": "globo.com/3.jpg", "trim": [1]},
+            ]
+        )
+
+        expect(response.status_code).to_equal(HTTP_OK)
+        expect(response.json()).to_equal(
+            [
+                self.url(image_url="globo.com/1.jpg"),
+                {"error": "Invalid thumbor URL parameters."},
+                {"error": "Invalid thumbor URL parameters."},
+            ]
+        )
+
+    def test_reports_out_of_range_numbers_without_failing_the_batch(self):
+        response = self.post(
+            '[{"image_url": "globo.com/1.jpg", "width": 300},'
+            ' {"image_url": "globo.com/2.jpg", "width": 1e400},'
+            ' {"image_url": "globo.com/3.jpg", "height": -1e400},'
+            ' {"image_url": "globo.com/4.jpg", "crop_left": 1e400,'
+            ' "crop_top": 0, "crop_right": 10, "crop_bottom": 10}]'
+        )
+
+        expect(response.status_code).to_equal(HTTP_OK)
+        expect(response.json()).to_equal(
+            [
+                self.url(image_url="globo.com/1.jpg", width=300),
+                {"error": "The width value 'inf' is not an integer."},
+                {"error": "The height value '-inf' is not an integer."},
+                {
+                    "error": "Invalid values for cropping. Expected all "
+                    "'crop_left', 'crop_top', 'crop_right', 'crop_bottom' "
+                    "to be integers."
+                },
+            ]
+        )
+
+    def test_rejects_booleans_and_fractions_as_integers(self):
+        crop = {"crop_left": 0, "crop_top": 0, "crop_right": 10}
+        response = self.post(
+            [
+                {"image_url": "globo.com/1.jpg", "width": 300.0},
+                {"image_url": "globo.com/2.jpg", "width": True},
+                {"image_url": "globo.com/3.jpg", "height": 1.9},
+                {"image_url": "globo.com/4.jpg", "crop_bottom": False, **crop},
+                {"image_url": "globo.com/5.jpg", "crop_bottom": 9.5, **crop},
+            ]
+        )
+
+        expect(response.status_code).to_equal(HTTP_OK)
+        crop_error = {
+            "error": "Invalid values for cropping. Expected all "
+            "'crop_left', 'crop_top', 'crop_right', 'crop_bottom' "
+            "to be integers."
+        }
+        expect(response.json()).to_equal(
+            [
+                self.url(image_url="globo.com/1.jpg", width=300),
+                {"error": "The width value 'True' is not an integer."},
+                {"error": "The height value '1.9' is not an integer."},
+                crop_error,
+                crop_error,
+            ]
+        )
+
+    def test_rejects_bodies_other_than_arrays(self):
+        for body in ("not json", '{"image_url": "globo.com/1.jpg"}'):
+            response = self.post(body)
+
+            expect(response.status_code).to_equal(HTTP_BAD_REQUEST)
+            expect(response.content.decode("utf-8")).to_equal(
+                "The request body must be a JSON array of options."
+            )
+
+    def test_limits_the_batch_size(self):
+        with override_settings(THUMBOR_BATCH_MAX_SIZE=2):
+            response = self.post([{"image_url": "globo.com/1.jpg"}] * 3)
+
+        expect(response.status_code).to_equal(HTTP_BAD_REQUEST)
+
+    def test_only_accepts_post(self):
+        response = self.client.get("/gen_urls/")
+
+        expect(response.status_code).to_equal(HTTP_METHOD_NOT_ALLOWED)
+
+    def test_keeps_csrf_protection(self):
+        client = Client(enforce_csrf_checks=True)
+
+        response = client.post("/gen_urls/", "[]", content_type="application/json")
+
+        expect(response.status_code).to_equal(HTTP_FORBIDDEN)
+
+
+@pytest.mark.skip_if(not DJANGO_PRESENT, "django must be present to run this test")
+@override_settings(ROOT_URLCONF="libthumbor.django.async_urls")
+class AsyncViewsTestCase(TestCase):
+    def setUp(self):
+        self.crypto = CryptoURL(settings.THUMBOR_SECURITY_KEY)
+        self.threads = []
+
+    def url(self, **options):
+        return settings.THUMBOR_SERVER + self.crypto.generate(**options).strip("/")
+
+    def record_thread(self, function):
+        def wrapper(*args, **kwargs):
+            self.threads.append(threading.get_ident())
+            return function(*args, **kwargs)
+
+        return wrapper
+
+    async def test_signs_on_the_event_loop(self):
+        with mock.patch(
+            "libthumbor.django.views._generate_url",
+            self.record_thread(views._generate_url),
+        ):
+            response = await self.async_client.get(
+                "/gen_url/", {"image_url": "globo.com/1.jpg", "width": 300}
+            )
+
+        expect(response.status_code).to_equal(HTTP_OK)
+        expect(response.content.decode("utf-8")).to_equal(
+            self.url(image_url="globo.com/1.jpg", width=300)
+        )
+        expect(self.threads).to_equal([threading.get_ident()])
+
+    async def test_answers_not_modified_for_a_matching_etag(self):
+        query = {"image_url": "globo.com/1.jpg"}
+
+        etag = (await self.async_client.get("/gen_url/", query))["ETag"]
+        response = await self.async_client.get(
+            "/gen_url/", query, headers={"If-None-Match": etag}
+        )
+
+        expect(response.status_code).to_equal(HTTP_NOT_MODIFIED)
+
+    async def test_reports_bad_requests(self):
+        response = await self.async_client.get(
+            "/gen_url/", {"image_url": "globo.com/1.jpg", "width": "aaa"}
+        )
+        post = await self.async_client.post("/gen_url/")
+
+        expect(response.status_code).to_equal(HTTP_BAD_REQUEST)
+        expect(post.status_code).to_equal(HTTP_METHOD_NOT_ALLOWED)
+
+    async def test_signs_small_batches_on_the_event_loop(self):
+        with mock.patch(
+            "libthumbor.django.views._batch_urls",
+            self.record_thread(views._batch_urls),
+        ):
+            response = await self.async_client.post(
+                "/gen_urls/",
+                json.dumps([{"image_url": "globo.com/1.jpg"}, {"width": 300}]),
+                content_type="application/json",
+            )
+
+        expect(response.json()).to_equal(
+            [
+                self.url(image_url="globo.com/1.jpg"),
+                {"error": "Invalid thumbor URL parameters."},
+            ]
+        )
+        expect(self.threads).to_equal([threading.get_ident()])
+
+    async def test_signs_large_batches_in_an_executor(self):
+        items = [{"image_url": f"globo.com/{index}.jpg"} for index in range(3)]
+
+        with mock.patch("libthumbor.django.views.ASYNC_INLINE_LIMIT", 2):
+            with mock.patch(
+                "libthumbor.django.views._batch_urls",
+                self.record_thread(views._batch_urls),
+            ):
+                response = await self.async_client.post(
+                    "/gen_urls/", json.dumps(items), content_type="application/json"
+                )
+
+        expect(response.json()).to_equal([self.url(**item) for item in items])
+        expect(self.threads).to_length(1)
+        expect(self.threads[0]).not_to_equal(threading.get_ident())
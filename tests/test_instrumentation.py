@@ -0,0 +1,134 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# libthumbor - python extension to thumbor
+# http://github.com/heynemann/libthumbor
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
+
+"""libthumbor instrumentation tests"""
+
+from unittest import TestCase, mock
+
+from preggy import expect
+
+from libthumbor import instrumentation
+from libthumbor.crypto import CryptoURL
+from libthumbor.instrumentation import Counters, Hooks, StatsdHooks
+from libthumbor.url import Url, url_for
+from libthumbor.url_signers.base64_hmac_sha1 import UrlSigner
+from libthumbor.url_signers.multi_key import MultiKeyUrlSigner
+
+KEY = "my-security-key"
+OPTIONS = {"image_url": "my.server.com/image.jpg", "width": 300, "height": 200}
+PATH = "300x200/my.server.com/image.jpg"
+
+
+class InstrumentationTestCase(TestCase):
+    def setUp(self):
+        self.counters = Counters()
+        previous = instrumentation.install(self.counters)
+        self.addCleanup(instrumentation.install, previous)
+
+    def test_counts_calls_and_latencies(self):
+        crypto = CryptoURL(KEY)
+
+        crypto.generate(**OPTIONS)
+        crypto.generate(unsafe=True, **OPTIONS)
+        url_for(**OPTIONS)
+        Url.parse_decrypted(PATH)
+
+        expect(dict(self.counters.calls)).to_equal(
+            {"generate": 2, "url_for": 1, "parse_decrypted": 1}
+        )
+        expect(sum(self.counters.histograms["generate"])).to_equal(2)
+        expect(self.counters.seconds["generate"]).to_be_greater_than(0)
+
+    def test_counts_cache_hits(self):
+        crypto = CryptoURL(KEY, cache_size=10)
+
+        crypto.generate(**OPTIONS)
+        crypto.generate(**OPTIONS)
+        crypto.generate(**OPTIONS)
+
+        expect(dict(self.counters.cache_hits)).to_equal({"generate": 2})
+        expect(dict(self.counters.cache_misses)).to_equal({"generate": 1})
+
+    def test_counts_validation_failures_by_reason(self):
+        signer = UrlSigner(KEY)
+        signature = signer.signature(PATH)
+
+        expect(signer.validate(signature, PATH)).to_be_true()
+        expect(signer.validate(None, PATH)).to_be_false()
+        expect(signer.validate("short", PATH)).to_be_false()
+        expect(signer.validate(UrlSigner("other").signature(PATH), PATH)).to_be_false()
+
+        expect(self.counters.calls["validate"]).to_equal(4)
+        expect(dict(self.counters.validation_failures)).to_equal(
+            {"missing": 1, "malformed": 1, "mismatch": 1}
+        )
+
+    def test_counts_one_validation_per_multi_key_check(self):
+        signer = MultiKeyUrlSigner(["next-key", KEY])
+
+        signer.validate(UrlSigner(KEY).signature(PATH), PATH)
+        signer.validate(UrlSigner("other").signature(PATH), PATH)
+
+        expect(self.counters.calls["validate"]).to_equal(2)
+        expect(dict(self.counters.validation_failures)).to_equal({"mismatch": 1})
+
+    def test_exports_prometheus_text(self):
+        self.counters.observe("generate", 0.000003)
+        self.counters.observe("generate", 0.5)
+        self.counters.cache("generate", True)
+        self.counters.validation_failure("mismatch")
+
+        text = self.counters.prometheus()
+
+        expect(text).to_include("# TYPE libthumbor_seconds histogram\n")
+        expect(text).to_include(
+            'libthumbor_seconds_bucket{operation="generate",le="5e-06"} 1\n'
+        )
+        expect(text).to_include(
+            'libthumbor_seconds_bucket{operation="generate",le="+Inf"} 2\n'
+        )
+        expect(text).to_include('libthumbor_seconds_count{operation="generate"} 2\n')
+        expect(text).to_include(
+            'libthumbor_cache_lookups_total{operation="generate",result="hit"} 1\n'
+        )
+        expect(text).to_include(
+            'libthumbor_validation_failures_total{reason="mismatch"} 1\n'
+        )
+
+
+class StatsdHooksTestCase(TestCase):
+    def test_sends_timings_and_counts(self):
+        client = mock.Mock()
+        hooks = StatsdHooks(client, prefix="thumbs")
+
+        with instrumentation.installed(hooks):
+            CryptoURL(KEY, cache_size=10).generate(**OPTIONS)
+            UrlSigner(KEY).validate(None, PATH)
+
+        expect(client.timing.call_args_list[0].args[0]).to_equal("thumbs.generate")
+        expect(client.timing.call_args_list[1].args[0]).to_equal("thumbs.validate")
+        expect([call.args for call in client.incr.call_args_list]).to_equal(
+            [("thumbs.generate.cache_miss",), ("thumbs.validate.failure.missing",)]
+        )
+
+
+class DisabledInstrumentationTestCase(TestCase):
+    def test_reports_nothing_once_uninstalled(self):
+        hooks = mock.Mock(spec=Hooks)
+
+        with instrumentation.installed(hooks):
+            url_for(**OPTIONS)
+
+        expect(instrumentation.hooks).to_be_null()
+        url_for(**OPTIONS)
+        UrlSigner(KEY).validate(None, PATH)
+
+        expect(hooks.observe.call_count).to_equal(1)
+        expect(hooks.validation_failure.called).to_be_false()
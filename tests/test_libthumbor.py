@@ -8,12 +8,19 @@
 # http://www.opensource.org/licenses/mit-license
 # Copyright (c) 2011 Bernardo Heynemann heynemann@gmail.com
 
+import os
 import re
+import subprocess
+import sys
 
+import pytest
 from six import b
 
+import libthumbor
 from libthumbor import CryptoURL, Signer, Url
 
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 
 def test_usage_new_format():
     key = "my-security-key"
@@ -57,3 +64,54 @@ def test_thumbor_can_decrypt_lib_thumbor_generated_url_new_format():
     signature, url = re.match(reg, url).groups()
 
     assert thumbor_signer.validate(b(signature), url)
+
+
+def test_import_is_lazy():
+    # -S leaves site-packages out, so no dependency can be imported either
+    code = (
+        "import sys, libthumbor; "
+        "print(sorted(name for name in sys.modules if name.startswith('libthumbor')))"
+    )
+
+    process = subprocess.run(
+        [sys.executable, "-S", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert process.stdout.strip() == "['libthumbor']"
+
+
+def test_signing_imports_only_what_it_needs():
+    deferred = (
+        "bisect",
+        "contextlib",
+        "importlib.util",
+        "libthumbor.cache",
+        "libthumbor.filters",
+        "threading",
+    )
+    code = (
+        "import sys; from libthumbor.crypto import CryptoURL; "
+        f"print([name for name in {deferred!r} if name in sys.modules])"
+    )
+
+    process = subprocess.run(
+        [sys.executable, "-S", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert process.stdout.strip() == "[]"
+
+
+def test_lazy_attributes():
+    assert libthumbor.CryptoURL is CryptoURL
+    assert {"CryptoURL", "Signer", "Url"} <= set(dir(libthumbor))
+
+    with pytest.raises(AttributeError, match="has no attribute 'Missing'"):
+        libthumbor.Missing  # pylint: disable=pointless-statement
@@ -14,7 +14,10 @@ from unittest import TestCase
 
 from preggy import expect
 
-from libthumbor.url import Url
+from libthumbor.crypto import CryptoURL
+from libthumbor.filters import split_filters
+from libthumbor.url import ParsedUrl, Url
+from libthumbor.url_signers.base64_hmac_sha1 import UrlSigner
 
 
 class UrlTestCase(TestCase):
@@ -87,6 +90,157 @@ class UrlTestCase(TestCase):
         expect(result).not_to_be_null()
         expect(result).to_be_like(expected)
 
+    def test_parsing_url_with_filters_containing_slashes(self):
+        url = "300x200/filters:watermark(a.com/logo.png,0,0,0)/some/image.jpg"
+
+        result = Url.parse_decrypted(url)
+
+        expect(result["filters"]).to_equal("watermark(a.com/logo.png,0,0,0)")
+        expect(result["image"]).to_equal("some/image.jpg")
+
+    def test_parsing_url_without_image_backtracks_like_the_regex(self):
+        for url in ("meta/smart/", "300x200/", "/", "filters:blur(1)/"):
+            expect(Url.parse_decrypted(url)).to_equal(
+                Url.parse_decrypted_with_regex(url)
+            )
+
+        expect(Url.parse_decrypted("meta/smart/")["image"]).to_equal("smart/")
+
+    def test_parsing_url_with_newlines_uses_the_regex(self):
+        url = "300x200/some/image\n.jpg"
+
+        result = Url.parse_decrypted(url)
+
+        expect(result["image"]).to_equal("some/image")
+        expect(result).to_equal(Url.parse_decrypted_with_regex(url))
+
+    def test_parsing_matches_the_regex(self):
+        for url in (
+            "some/image.jpg",
+            "/debug/meta/trim:top-left:10/1x2:3x4/full-fit-in/-origx-0/left/"
+            "bottom/smart/filters:a(1):b(2)/some/image.jpg",
+            "trim:5/fit-in/x/right/some/image.jpg",
+            "full-adaptive-fit-in/300x200/middle/some/image.jpg",
+            "smart/meta/300/some/image.jpg",
+            "10x20:30x/leftish/some/image.jpg",
+        ):
+            expect(Url.parse_decrypted(url)).to_equal(
+                Url.parse_decrypted_with_regex(url)
+            )
+
+    def test_compiled_regexes_are_cached(self):
+        expect(Url.compiled()).to_equal(Url.compiled())
+        expect(Url.compiled().pattern).to_equal(Url.regex())
+        expect(Url.compiled(False)).to_equal(Url.compiled_regex)
+
+    def test_can_parse_and_validate_signed_url(self):
+        url = CryptoURL("key").generate(
+            image_url="some/image.jpg", width=300, height=200, smart=True
+        )
+
+        result = Url.parse(url, signer=UrlSigner("key"))
+
+        expect(result).not_to_be_null()
+        expect(result["hash"]).to_equal(url.split("/")[1])
+        expect(result["unsafe"]).to_be_false()
+        expect(result["width"]).to_equal(300)
+        expect(result["smart"]).to_be_true()
+        expect(result["image"]).to_equal("some/image.jpg")
+
+    def test_parse_refuses_wrong_signature(self):
+        url = CryptoURL("key").generate(image_url="some/image.jpg", width=300)
+
+        expect(Url.parse(url, signer=UrlSigner("other-key"))).to_be_null()
+        expect(Url.parse(url.replace("300x0", "301x0"), UrlSigner("key"))).to_be_null()
+
+    def test_parse_without_signer_does_not_validate(self):
+        result = Url.parse("/whatever/300x200/some/image.jpg")
+
+        expect(result["hash"]).to_equal("whatever")
+        expect(result["width"]).to_equal(300)
+
+    def test_parse_refuses_unsafe_urls_unless_allowed(self):
+        url = "/unsafe/300x200/some/image.jpg"
+
+        expect(Url.parse(url, signer=UrlSigner("key"))).to_be_null()
+
+        result = Url.parse(url, signer=UrlSigner("key"), allow_unsafe=True)
+        expect(result["unsafe"]).to_be_true()
+        expect(result["hash"]).to_be_null()
+        expect(result["image"]).to_equal("some/image.jpg")
+
+    def test_parse_refuses_urls_without_signature_or_image(self):
+        expect(Url.parse("some-image.jpg")).to_be_null()
+        expect(Url.parse("//some/image.jpg")).to_be_null()
+        expect(Url.parse("/signature/")).to_be_null()
+
+    def test_can_iterate_parsed_urls(self):
+        crypto = CryptoURL("key")
+        urls = [
+            crypto.generate(image_url="some/image.jpg", width=300) + "\n",
+            "/unsafe/300x200/some/image.jpg\r\n",
+            crypto.generate(image_url="some/image.jpg", width=200),
+        ]
+
+        results = Url.iter_parse(iter(urls), signer=UrlSigner("key"))
+
+        expect(next(results)["width"]).to_equal(300)
+        expect(next(results)).to_be_null()
+        expect(next(results)["image"]).to_equal("some/image.jpg")
+        expect(list(results)).to_be_empty()
+
+        results = list(Url.iter_parse(urls, allow_unsafe=True, as_object=True))
+        expect([result.width for result in results]).to_equal([300, 300, 200])
+        expect(results[1].unsafe).to_be_true()
+
+    def test_can_parse_as_object(self):
+        url = "debug/meta/trim:top-left/10x20:200x300/adaptive-full-fit-in/-400x-300/left/top/smart/filters:brightness(100):watermark(a.png,0,0,0)/some/image.jpg"
+
+        result = Url.parse_decrypted(url, as_object=True)
+
+        expect(result).to_be_instance_of(ParsedUrl)
+        expect(result.as_dict()).to_equal(Url.parse_decrypted(url))
+        expect(result.width).to_equal(400)
+        expect(result.crop).to_equal(
+            {"left": 10, "top": 20, "right": 200, "bottom": 300}
+        )
+        expect(result.image).to_equal("some/image.jpg")
+        expect(result.generate_options() + "/some/image.jpg").to_equal(url)
+
+    def test_parsed_object_splits_filters_lazily(self):
+        result = Url.parse_decrypted(
+            "filters:fill(red):watermark(a.png,0,0,0):round_corner(20|20,0,0,0)/some/image.jpg",
+            as_object=True,
+        )
+
+        expect(result.filter_list).to_equal(
+            ["fill(red)", "watermark(a.png,0,0,0)", "round_corner(20|20,0,0,0)"]
+        )
+        expect(split_filters("a(1:2):b")).to_equal(["a(1:2)", "b"])
+        expect(split_filters("")).to_equal([])
+
+    def test_parsed_object_from_the_regex_fallback(self):
+        url = "300x200/filters:blur(1)/some/image\n.jpg"
+
+        result = Url.parse_decrypted(url, as_object=True)
+
+        expect(result).to_equal(ParsedUrl.from_dict(Url.parse_decrypted(url)))
+        expect(result.filters).to_equal("blur(1)")
+        expect(result.image).to_equal("some/image")
+
+    def test_can_parse_signed_url_as_object(self):
+        url = CryptoURL("key").generate(
+            image_url="some/image.jpg", width=300, trim=True
+        )
+
+        result = Url.parse(url, signer=UrlSigner("key"), as_object=True)
+
+        expect(result.hash).to_equal(url.split("/")[1])
+        expect(result.unsafe).to_be_false()
+        expect(result.trim).to_equal("trim")
+        expect(result.generate_options()).to_equal("trim/300x0")
+        expect(Url.parse("/unsafe/some/image.jpg", as_object=True).unsafe).to_be_true()
+
     def test_can_generate_url(self):
         url = Url.generate_options(
             debug=True,
@@ -118,6 +272,24 @@ class UrlTestCase(TestCase):
 
         expect(url).to_be_empty()
 
+    def test_can_generate_url_with_positional_arguments(self):
+        url = Url.generate_options(False, 300, 200, True)
+
+        expect(url).to_equal("300x200/smart")
+
+    def test_generate_url_rejects_unknown_arguments(self):
+        with expect.error_to_happen(TypeError):
+            Url.generate_options(wdth=300)  # pylint: disable=unexpected-keyword-arg
+
+    def test_generate_url_rejects_repeated_arguments(self):
+        with expect.error_to_happen(TypeError):
+            # pylint: disable-next=redundant-keyword-arg
+            Url.generate_options(True, debug=True)
+
+    def test_generate_url_rejects_too_many_positional_arguments(self):
+        with expect.error_to_happen(TypeError):
+            Url.generate_options(*range(19))
+
     def test_can_generate_url_with_fitin(self):
         url = Url.generate_options(fit_in=True, adaptive=False, full=False)
 
@@ -10,11 +10,21 @@
 
 """libthumbor URL composer tests"""
 
+import inspect
 from unittest import TestCase
 
 from preggy import expect
 
-from libthumbor.url import unsafe_url, url_for
+from libthumbor.filters import Filter, FilterChain
+from libthumbor.url import (
+    URL_PARTS,
+    Url,
+    calculate_fit_in,
+    calculate_width_and_height,
+    get_url_parts,
+    unsafe_url,
+    url_for,
+)
 
 IMAGE_URL = "my.server.com/some/path/to/image.jpg"
 IMAGE_MD5 = "84996242f65a4d864aceb125e1c4c5ba"
@@ -588,3 +598,152 @@ class UnsafeUrlTestCase(TestCase):
         expect(f"unsafe/100x140/smart/{IMAGE_URL}").to_equal(
             unsafe_url(image_url=IMAGE_URL, width=100, height=140, smart=True),
         )
+
+
+def test_filters_given_as_a_string_are_kept_as_they_are():
+    for filters in (
+        "quality(80):blur(2)",
+        FilterChain([Filter("quality", 80), "blur(2)"]),
+    ):
+        url = url_for(filters=filters, image_url=IMAGE_URL)
+
+        expect(url).to_equal(f"filters:quality(80):blur(2)/{IMAGE_MD5}")
+
+
+def test_unknown_options_are_ignored():
+    url = url_for(width=300, unknown=True, image_url=IMAGE_URL)
+
+    expect("300x0/84996242f65a4d864aceb125e1c4c5ba").to_equal(url)
+
+
+def test_options_order_does_not_change_url():
+    url = url_for(
+        filters=["blur(2)"],
+        smart=True,
+        valign="top",
+        halign="left",
+        height=200,
+        width=300,
+        fit_in=True,
+        crop=((10, 10), (200, 200)),
+        trim=True,
+        meta=True,
+        image_url=IMAGE_URL,
+    )
+
+    expect(
+        "meta/trim/10x10:200x200/fit-in/300x200/left/top/smart/filters:blur(2)/"
+        "84996242f65a4d864aceb125e1c4c5ba"
+    ).to_equal(url)
+
+
+def test_url_parts_are_in_the_same_order_as_generate_options():
+    url = url_for(
+        meta=True,
+        trim=True,
+        crop=((10, 10), (200, 200)),
+        fit_in=True,
+        width=300,
+        height=200,
+        halign="left",
+        valign="top",
+        smart=True,
+        filters=["blur(2)"],
+        image_url=IMAGE_URL,
+    )
+
+    options = Url.generate_options(
+        meta=True,
+        trim=True,
+        crop_left=10,
+        crop_top=10,
+        crop_right=200,
+        crop_bottom=200,
+        fit_in=True,
+        width=300,
+        height=200,
+        halign="left",
+        valign="top",
+        smart=True,
+        filters="blur(2)",
+    )
+
+    expect(url).to_equal(f"{options}/84996242f65a4d864aceb125e1c4c5ba")
+
+
+# the segment each URL_PARTS entry composes from the options below
+SEGMENTS = {
+    "debug": "debug",
+    "meta": "meta",
+    "trim": "trim",
+    "crop": "10x10:200x200",
+    "fit_in": "fit-in",
+    "dimensions": "300x200",
+    "halign": "left",
+    "valign": "top",
+    "smart": "smart",
+    "filters": "filters:blur(2)",
+}
+
+
+def test_url_parts_declares_every_option_once():
+    options = [name for part in URL_PARTS for name in part.options]
+    arguments = [name for part in URL_PARTS for name in part.arguments]
+
+    expect(sorted(arguments)).to_equal(
+        sorted(inspect.signature(Url.generate_options).parameters)
+    )
+    expect(len(set(options))).to_equal(len(options))
+    expect([part.name for part in URL_PARTS]).to_equal(list(SEGMENTS))
+
+
+def test_serializers_follow_the_url_parts_order():
+    parts = get_url_parts(
+        filters=["blur(2)"],
+        smart=True,
+        valign="top",
+        halign="left",
+        height=200,
+        width=300,
+        fit_in=True,
+        crop=((10, 10), (200, 200)),
+        trim=True,
+        meta=True,
+        image_url=IMAGE_URL,
+    )
+    options = Url.generate_options(
+        filters="blur(2)",
+        smart=True,
+        valign="top",
+        halign="left",
+        height=200,
+        width=300,
+        fit_in=True,
+        crop_left=10,
+        crop_top=10,
+        crop_right=200,
+        crop_bottom=200,
+        trim=True,
+        meta=True,
+        debug=True,
+    )
+
+    expect(parts).to_equal([SEGMENTS[part.name] for part in URL_PARTS if part.options])
+    expect(options.split("/")).to_equal([SEGMENTS[part.name] for part in URL_PARTS])
+
+
+def test_size_helpers_compose_the_segments_get_url_parts_does():
+    for options in (
+        {"width": 300, "height": 200, "adaptive_full_fit_in": True},
+        {"width": 300, "flip": True, "fit_in": True},
+        {"flip": True, "flop": True},
+        {"height": 200, "flop": True, "full_fit_in": True},
+    ):
+        url_parts = []
+        calculate_fit_in(options, url_parts)
+        calculate_width_and_height(url_parts, options)
+
+        expect(url_parts).to_equal(get_url_parts(image_url=IMAGE_URL, **options))
+
+    with expect.error_to_happen(ValueError):
+        calculate_fit_in({"fit_in": True, "flip": True}, [])
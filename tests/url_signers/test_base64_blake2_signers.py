@@ -0,0 +1,74 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# thumbor imaging service
+# https://github.com/thumbor/thumbor/wiki
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 globo.com timehome@corp.globo.com
+
+import base64
+import hashlib
+from unittest import TestCase
+
+from preggy import expect
+
+from libthumbor.url_signers import base64_blake2b, base64_blake2s
+
+URL = "10x11:12x13/-300x-300/center/middle/smart/some/image.jpg"
+
+
+class Base64Blake2bUrlSignerTestCase(TestCase):
+    def test_can_sign_url(self):
+        signer = base64_blake2b.UrlSigner(security_key="something")
+        expected = base64.urlsafe_b64encode(
+            hashlib.blake2b(
+                URL.encode("utf-8"), key=b"something", digest_size=16
+            ).digest()
+        )
+
+        expect(signer.signature(URL)).to_equal(expected)
+
+    def test_can_truncate_digest(self):
+        signer = base64_blake2b.UrlSigner(security_key="something", digest_size=12)
+
+        expect(signer.signature(URL)).to_length(16)
+        expect(signer.validate(signer.signature(URL), URL)).to_be_true()
+
+    def test_rejects_too_long_keys(self):
+        with expect.error_to_happen(
+            ValueError, message="BLAKE2b security keys are limited to 64 bytes."
+        ):
+            base64_blake2b.UrlSigner(security_key="k" * 65)
+
+
+class Base64Blake2sUrlSignerTestCase(TestCase):
+    def test_can_sign_url(self):
+        signer = base64_blake2s.UrlSigner(security_key="something")
+        expected = base64.urlsafe_b64encode(
+            hashlib.blake2s(
+                URL.encode("utf-8"), key=b"something", digest_size=16
+            ).digest()
+        )
+
+        expect(signer.signature(URL)).to_equal(expected)
+
+    def test_different_digest_sizes_do_not_share_hashers(self):
+        short = base64_blake2s.UrlSigner(security_key="something", digest_size=8)
+        default = base64_blake2s.UrlSigner(security_key="something")
+
+        expect(short.signature(URL)).not_to_equal(default.signature(URL))
+        expect(default.signature(URL)).to_length(24)
+
+    def test_rejects_too_long_keys(self):
+        with expect.error_to_happen(
+            ValueError, message="BLAKE2s security keys are limited to 32 bytes."
+        ):
+            base64_blake2s.UrlSigner(security_key="k" * 33)
+
+    def test_rejects_too_long_digests(self):
+        with expect.error_to_happen(
+            ValueError, message="BLAKE2s digests are between 1 and 32 bytes."
+        ):
+            base64_blake2s.UrlSigner(security_key="something", digest_size=33)
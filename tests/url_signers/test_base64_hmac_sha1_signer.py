@@ -16,7 +16,7 @@ from unittest import TestCase
 from preggy import expect
 from six import text_type
 
-from libthumbor.url_signers.base64_hmac_sha1 import UrlSigner
+from libthumbor.url_signers.base64_hmac_sha1 import UrlSigner, keyed_hmac
 
 
 class Base64HmacSha1UrlSignerTestCase(TestCase):
@@ -35,3 +35,42 @@ class Base64HmacSha1UrlSignerTestCase(TestCase):
         )
         actual = signer.signature(url)
         expect(actual).to_equal(expected)
+
+    def test_signing_does_not_change_the_signer_state(self):
+        signer = UrlSigner(security_key="something")
+        url = "10x11:12x13/-300x-300/center/middle/smart/some/image.jpg"
+
+        expect(signer.signature(url)).to_equal(signer.signature(url))
+
+    def test_can_validate_str_and_bytes_signatures(self):
+        signer = UrlSigner(security_key="something")
+        url = "300x200/some/image.jpg"
+        signature = signer.signature(url)
+
+        expect(signer.validate(signature, url)).to_be_true()
+        expect(signer.validate(signature.decode("ascii"), url)).to_be_true()
+        expect(signer.validate(signature, "300x201/some/image.jpg")).to_be_false()
+
+    def test_can_sign_many_urls(self):
+        signer = UrlSigner(security_key="something")
+        urls = ["300x200/some/image.jpg", "fit-in/300x200/other/image.jpg"]
+
+        expect(signer.signatures(urls)).to_equal(
+            [signer.signature(url) for url in urls]
+        )
+
+    def test_signers_of_the_same_key_share_the_keyed_hmac(self):
+        keyed_hmac.cache_clear()
+        UrlSigner("something")
+        UrlSigner(b"something")
+
+        expect(keyed_hmac.cache_info().misses).to_equal(1)
+
+    def test_hmac_is_a_copy_of_the_keyed_hmac(self):
+        url = "300x200/some/image.jpg"
+        signature = UrlSigner("something").signature(url)
+
+        UrlSigner("something").hmac.update(b"x")
+
+        expect(UrlSigner("something").hmac is UrlSigner("something").hmac).to_be_false()
+        expect(UrlSigner("something").validate(signature, url)).to_be_true()
@@ -0,0 +1,35 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# thumbor imaging service
+# https://github.com/thumbor/thumbor/wiki
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 globo.com timehome@corp.globo.com
+
+import base64
+import hashlib
+import hmac
+from unittest import TestCase
+
+from preggy import expect
+
+from libthumbor.url_signers.base64_hmac_sha256 import UrlSigner
+
+
+class Base64HmacSha256UrlSignerTestCase(TestCase):
+    def test_can_sign_url(self):
+        signer = UrlSigner(security_key="something")
+        url = "10x11:12x13/-300x-300/center/middle/smart/some/image.jpg"
+        expected = base64.urlsafe_b64encode(
+            hmac.new(b"something", url.encode("utf-8"), hashlib.sha256).digest()
+        )
+
+        expect(signer.signature(url)).to_equal(expected)
+
+    def test_can_validate_url(self):
+        signer = UrlSigner(security_key="something")
+        url = "300x200/some/image.jpg"
+
+        expect(signer.validate(signer.signature(url), url)).to_be_true()
@@ -43,6 +43,44 @@ class BaseSignerTestCase(TestCase):
             signer.validate("http://www.test.com+1", "http://www.test.com")
         ).to_be_true()
 
+    def test_can_validate_url_with_bytes_signature(self):
+        class TestSigner(BaseUrlSigner):
+            def signature(self, url):
+                return f"{url}+1"
+
+        signer = TestSigner(security_key="téste")
+        expect(
+            signer.validate(b"http://www.test.com+1", "http://www.test.com")
+        ).to_be_true()
+
+    def test_can_validate_url_with_unicode_signature(self):
+        class TestSigner(BaseUrlSigner):
+            def signature(self, url):
+                return f"{url}+1"
+
+        signer = TestSigner(security_key="téste")
+        expect(signer.validate("téste+1", "téste")).to_be_true()
+        expect(signer.validate("téste+2", "téste")).to_be_false()
+
+    def test_does_not_validate_wrong_signature(self):
+        class TestSigner(BaseUrlSigner):
+            def signature(self, url):
+                return f"{url}+1".encode()
+
+        signer = TestSigner(security_key="téste")
+        expect(
+            signer.validate("http://www.test.com+2", "http://www.test.com")
+        ).to_be_false()
+        expect(signer.validate(None, "http://www.test.com")).to_be_false()
+
+    def test_can_sign_many_urls(self):
+        class TestSigner(BaseUrlSigner):
+            def signature(self, url):
+                return f"{url}+1"
+
+        signer = TestSigner(security_key="téste")
+        expect(signer.signatures(["a", "b"])).to_equal(["a+1", "b+1"])
+
     def test_has_abstract_method(self):
         signer = BaseUrlSigner(security_key="téste")
 
@@ -0,0 +1,76 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# thumbor imaging service
+# https://github.com/thumbor/thumbor/wiki
+
+# Licensed under the MIT license:
+# http://www.opensource.org/licenses/mit-license
+# Copyright (c) 2011 globo.com timehome@corp.globo.com
+
+from unittest import TestCase
+
+from preggy import expect
+
+from libthumbor.crypto import CryptoURL
+from libthumbor.url_signers import base64_blake2s, base64_hmac_sha1
+from libthumbor.url_signers.multi_key import MultiKeyUrlSigner
+
+URL = "300x200/some/image.jpg"
+
+
+class MultiKeyUrlSignerTestCase(TestCase):
+    def setUp(self):
+        self.current = base64_hmac_sha1.UrlSigner("current")
+        self.previous = base64_hmac_sha1.UrlSigner("previous")
+        self.signer = MultiKeyUrlSigner(["current", "previous"])
+
+    def test_requires_a_key(self):
+        with expect.error_to_happen(
+            ValueError, message="At least one security key is required."
+        ):
+            MultiKeyUrlSigner([])
+
+    def test_accepts_a_single_key(self):
+        signer = MultiKeyUrlSigner("current")
+
+        expect(signer.signature(URL)).to_equal(self.current.signature(URL))
+
+    def test_signs_with_the_current_key(self):
+        expect(self.signer.security_key).to_equal(b"current")
+        expect(self.signer.signature(URL)).to_equal(self.current.signature(URL))
+        expect(self.signer.signatures([URL])).to_equal([self.current.signature(URL)])
+
+    def test_validates_with_any_key(self):
+        expect(self.signer.match(self.current.signature(URL), URL)).to_equal(0)
+        expect(self.signer.match(self.previous.signature(URL), URL)).to_equal(1)
+        expect(self.signer.validate(self.previous.signature(URL), URL)).to_be_true()
+        expect(self.signer.validate(b"wrong", URL)).to_be_false()
+
+        expect(self.signer.matches).to_equal([1, 2])
+        expect(self.signer.failures).to_equal(1)
+
+    def test_tries_the_most_matched_key_first(self):
+        signature = self.previous.signature(URL)
+
+        self.signer.match(signature, URL)
+        expect(self.signer._order).to_equal([1, 0])  # pylint: disable=protected-access
+
+        for _ in range(2):
+            self.signer.match(self.current.signature(URL), URL)
+        expect(self.signer._order).to_equal([0, 1])  # pylint: disable=protected-access
+
+    def test_uses_the_given_signer(self):
+        signer = MultiKeyUrlSigner(
+            ["current", "previous"], signer="libthumbor.url_signers.base64_blake2s"
+        )
+        previous = base64_blake2s.UrlSigner("previous")
+
+        expect(signer.match(previous.signature(URL), URL)).to_equal(1)
+
+    def test_can_be_used_by_crypto_url(self):
+        crypto = CryptoURL(["current", "previous"], signer=MultiKeyUrlSigner)
+
+        url = crypto.generate(image_url="some/image.jpg", width=300, height=200)
+
+        expect(url).to_equal(f"/{self.current.signature(URL).decode('ascii')}/{URL}")